@@ -0,0 +1,245 @@
+"""Admission control for calls to model providers.
+
+Each `ConcurrencyLimiter` caps how many calls run against a provider at once
+and how many more may wait for a slot. Request handlers wrap their work in
+`request_scope(time_remaining)`; inside it a full queue fails fast with
+`QueueFull` and waiting never outlasts the request deadline. Work outside a
+request scope (index builds, catalog reloads, background explanations) waits
+for a slot without either limit, but never holds the last free slot, so a
+large rebuild can't starve requests. `AsyncConcurrencyLimiter` does the same
+for coroutines on one event loop.
+"""
+
+import asyncio
+import contextvars
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+
+import numpy as np
+
+# absolute time.monotonic() deadline of the current request; unset outside requests
+_request_deadline: contextvars.ContextVar[float] = contextvars.ContextVar("request_deadline")
+
+
+class AdmissionRejected(Exception):
+    """A provider call was not admitted."""
+
+
+class QueueFull(AdmissionRejected):
+    pass
+
+
+class AdmissionTimeout(AdmissionRejected):
+    pass
+
+
+@contextmanager
+def request_scope(time_remaining: float | None):
+    """Mark the enclosed work as serving a request with `time_remaining` seconds left (None: no deadline)."""
+    deadline = float("inf") if time_remaining is None else time.monotonic() + time_remaining
+    token = _request_deadline.set(deadline)
+    try:
+        yield
+    finally:
+        _request_deadline.reset(token)
+
+
+def split_limit(name: str, limit: int, asynchronous: bool, minimum: int = 0) -> tuple[int, int]:
+    """Return the (thread, asyncio) shares of the per-provider limit `name`.
+
+    The asyncio server runs some calls on threads (Recommend, explanations,
+    index builds) and the rest on the event loop; each side has its own
+    limiter, so the limit is split between them rather than granted twice.
+    The event loop, which serves queries, gets the larger half. Raises
+    ValueError when a share would fall below `minimum`.
+    """
+    if not asynchronous:
+        return limit, 0
+    shares = limit // 2, limit - limit // 2
+    if min(shares) < minimum:
+        raise ValueError(
+            f"{name}={limit} is too small for the asyncio server, which splits it between "
+            f"threads and the event loop; use at least {2 * minimum}"
+        )
+    return shares
+
+
+class _LimiterBase:
+    """Counters and admission policy shared by the thread and asyncio limiters."""
+
+    def __init__(self, name: str, max_concurrency: int = 4, max_queue: int = 32, wait_window: int = 1024):
+        self.name = name
+        self.max_concurrency = max(1, max_concurrency)
+        self.max_queue = max(0, max_queue)
+        self.in_flight = 0
+        self.queue_depth = 0
+        # slots work outside a request may hold; one is kept for requests
+        # unless the limiter has only one
+        self.max_background = max(1, self.max_concurrency - 1)
+        self.background_in_flight = 0
+        self.request_queue_depth = 0  # waiters serving requests, the ones `max_queue` limits
+        self.admitted = 0
+        self.rejected = 0
+        self.timed_out = 0
+        self.max_wait = 0.0
+        self._total_wait = 0.0
+        self._recent_waits: deque[float] = deque(maxlen=wait_window)
+
+    def _has_slot(self, background: bool) -> bool:
+        if self.in_flight >= self.max_concurrency:
+            return False
+        return not background or self.background_in_flight < self.max_background
+
+    def _admit_now(self, background: bool) -> bool:
+        # a free slot goes to the queue first, so new arrivals can't overtake waiters;
+        # requests only wait behind other requests
+        return self._has_slot(background) and not (self.queue_depth if background else self.request_queue_depth)
+
+    def _check_queue(self, in_request: bool):
+        if in_request and self.request_queue_depth >= self.max_queue:
+            self.rejected += 1
+            raise QueueFull(
+                f"{self.name} is at capacity ({self.in_flight} running, {self.queue_depth} queued)"
+            )
+
+    def _remaining(self, deadline: float | None) -> float | None:
+        """Seconds this waiter may still wait (None: no limit); raises once the deadline passed."""
+        if deadline is None:
+            return None
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            self.timed_out += 1
+            raise AdmissionTimeout(f"Deadline expired while queued for {self.name}")
+        # gRPC reports "no deadline" as a huge time_remaining
+        return min(remaining, threading.TIMEOUT_MAX)
+
+    def _admit(self, waited: float, background: bool):
+        self.in_flight += 1
+        self.background_in_flight += background
+        self.admitted += 1
+        self._total_wait += waited
+        self.max_wait = max(self.max_wait, waited)
+        self._recent_waits.append(waited)
+
+    def _release(self, background: bool):
+        self.in_flight -= 1
+        self.background_in_flight -= background
+
+    def _enqueue(self, background: bool, count: int):
+        self.queue_depth += count
+        if not background:
+            self.request_queue_depth += count
+
+    def _stats(self) -> dict:
+        recent = np.array(self._recent_waits) if self._recent_waits else np.zeros(1)
+        return {
+            "name": self.name,
+            "max_concurrency": self.max_concurrency,
+            "max_queue": self.max_queue,
+            "in_flight": self.in_flight,
+            "queue_depth": self.queue_depth,
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "timed_out": self.timed_out,
+            "avg_wait_ms": 1000 * self._total_wait / self.admitted if self.admitted else 0.0,
+            "p99_wait_ms": 1000 * float(np.percentile(recent, 99)),
+            "max_wait_ms": 1000 * self.max_wait,
+        }
+
+
+class ConcurrencyLimiter(_LimiterBase):
+    """Bounded-concurrency gate with a bounded FIFO wait queue, for threads."""
+
+    def __init__(self, name: str, max_concurrency: int = 4, max_queue: int = 32, wait_window: int = 1024):
+        super().__init__(name, max_concurrency, max_queue, wait_window)
+        self._condition = threading.Condition()
+
+    @contextmanager
+    def acquire(self):
+        background = self._enter()
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._release(background)
+                # all: the first waiter may be background work that can't take the reserved slot
+                self._condition.notify_all()
+
+    def _enter(self) -> bool:
+        deadline = _request_deadline.get(None)
+        background = deadline is None
+        start = time.monotonic()
+
+        with self._condition:
+            if self._admit_now(background):
+                self._admit(0.0, background)
+                return background
+
+            self._check_queue(not background)
+            self._enqueue(background, 1)
+            try:
+                while not self._has_slot(background):
+                    self._condition.wait(self._remaining(deadline))
+            finally:
+                self._enqueue(background, -1)
+
+            self._admit(time.monotonic() - start, background)
+            return background
+
+    def stats(self) -> dict:
+        with self._condition:
+            return self._stats()
+
+
+class AsyncConcurrencyLimiter(_LimiterBase):
+    """`ConcurrencyLimiter` for coroutines running on a single event loop."""
+
+    def __init__(self, name: str, max_concurrency: int = 4, max_queue: int = 32, wait_window: int = 1024):
+        super().__init__(name, max_concurrency, max_queue, wait_window)
+        self._condition = asyncio.Condition()
+
+    @asynccontextmanager
+    async def acquire(self):
+        background = await self._enter()
+        try:
+            yield
+        finally:
+            async with self._condition:
+                self._release(background)
+                self._condition.notify_all()
+
+    async def _enter(self) -> bool:
+        deadline = _request_deadline.get(None)
+        background = deadline is None
+        start = time.monotonic()
+
+        async with self._condition:
+            if self._admit_now(background):
+                self._admit(0.0, background)
+                return background
+
+            self._check_queue(not background)
+            self._enqueue(background, 1)
+            try:
+                while not self._has_slot(background):
+                    # raises past the deadline, so check it before creating the wait coroutine
+                    timeout = self._remaining(deadline)
+                    try:
+                        await asyncio.wait_for(self._condition.wait(), timeout)
+                    except asyncio.TimeoutError:
+                        pass
+            except BaseException:
+                # a cancelled or timed-out waiter may have swallowed a notify; pass it on
+                if self.in_flight < self.max_concurrency:
+                    self._condition.notify_all()
+                raise
+            finally:
+                self._enqueue(background, -1)
+
+            self._admit(time.monotonic() - start, background)
+            return background
+
+    def stats(self) -> dict:
+        return self._stats()
@@ -0,0 +1,175 @@
+"""asyncio variant of the RAG gRPC service (GRPC_ASYNC=true).
+
+Query, QueryStream and BatchQuery run as coroutines on one event loop: query
+embedding and generation await the async Ollama/OpenAI clients, so an
+in-flight request costs a task rather than a thread. Index scans go to worker
+threads. The remaining RPCs reuse the synchronous handlers on the migration
+thread pool.
+"""
+
+import asyncio
+import logging
+import os
+from concurrent import futures
+
+import grpc
+
+from app.admission import AdmissionRejected, request_scope
+from app.generated import rag_pb2, rag_pb2_grpc
+from app.grpc_server import (
+    RAGServicer,
+    autocomplete_response,
+    build_catalog_watcher,
+    build_engine,
+    build_warmer,
+    filters_from_proto,
+    metrics_response,
+    prompt_usage_to_proto,
+    query_response_from_result,
+    reject,
+    search_courses_response,
+    sources_to_proto,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncRAGServicer(RAGServicer):
+    async def Health(self, request, context):
+        return rag_pb2.HealthResponse(status=self.health_status())
+
+    async def Query(self, request, context):
+        question = request.question
+        max_results = request.max_results or 5
+        filters = filters_from_proto(request.filters) if request.HasField("filters") else None
+        search_mode = request.search_mode or None
+
+        logger.info(f"Received query: {question} (filters: {filters}, mode: {search_mode or 'default'})")
+
+        try:
+            with request_scope(context.time_remaining()):
+                result = await self.rag_engine.aquery(
+                    question,
+                    max_results=max_results,
+                    filters=filters,
+                    search_mode=search_mode,
+                )
+
+            return query_response_from_result(result)
+        except AdmissionRejected as e:
+            return reject(context, e, rag_pb2.QueryResponse())
+        except Exception as e:
+            logger.error(f"Error processing query: {e}")
+            return rag_pb2.QueryResponse(
+                answer="",
+                error_message=str(e),
+            )
+
+    async def QueryStream(self, request, context):
+        question = request.question
+        max_results = request.max_results or 5
+        filters = filters_from_proto(request.filters) if request.HasField("filters") else None
+        search_mode = request.search_mode or None
+
+        logger.info(f"Received streaming query: {question} (filters: {filters}, mode: {search_mode or 'default'})")
+
+        # a client cancel surfaces as CancelledError at the next await, which
+        # also closes the model stream
+        prompt_usage = None
+        try:
+            with request_scope(context.time_remaining()):
+                async for event in self.rag_engine.aquery_stream(
+                    question,
+                    max_results=max_results,
+                    filters=filters,
+                    search_mode=search_mode,
+                ):
+                    if "sources" in event:
+                        yield rag_pb2.QueryStreamChunk(sources=sources_to_proto(event["sources"]))
+                    elif "prompt_usage" in event:
+                        prompt_usage = prompt_usage_to_proto(event["prompt_usage"])
+                    elif "delta" in event:
+                        yield rag_pb2.QueryStreamChunk(answer_delta=event["delta"])
+                    elif "error" in event:
+                        yield rag_pb2.QueryStreamChunk(error_message=event["error"], done=True, prompt_usage=prompt_usage)
+                        return
+
+            yield rag_pb2.QueryStreamChunk(done=True, prompt_usage=prompt_usage)
+        except AdmissionRejected as e:
+            reject(context, e, None)
+        except Exception as e:
+            logger.error(f"Error processing streaming query: {e}")
+            yield rag_pb2.QueryStreamChunk(error_message=str(e), done=True)
+
+    async def BatchQuery(self, request, context):
+        questions = list(request.questions)
+        max_results = request.max_results or 5
+        filters = filters_from_proto(request.filters) if request.HasField("filters") else None
+        search_mode = request.search_mode or None
+
+        logger.info(f"Received batch query with {len(questions)} questions (sources_only: {request.sources_only})")
+
+        try:
+            with request_scope(context.time_remaining()):
+                results = await self.rag_engine.aquery_many(
+                    questions,
+                    max_results=max_results,
+                    filters=filters,
+                    search_mode=search_mode,
+                    sources_only=request.sources_only,
+                )
+
+            return rag_pb2.BatchQueryResponse(
+                results=[query_response_from_result(result) for result in results],
+            )
+        except AdmissionRejected as e:
+            return reject(context, e, rag_pb2.BatchQueryResponse())
+        except Exception as e:
+            logger.error(f"Error processing batch query: {e}")
+            return rag_pb2.BatchQueryResponse(
+                error_message=str(e),
+            )
+
+    # catalog lookups are in-memory and quick, so they run on the loop too
+    async def SearchCourses(self, request, context):
+        try:
+            return search_courses_response(self.rag_engine.catalog, request)
+        except Exception as e:
+            logger.error(f"Error searching courses: {e}")
+            return rag_pb2.SearchCoursesResponse(error_message=str(e))
+
+    async def Autocomplete(self, request, context):
+        try:
+            return autocomplete_response(self.rag_engine.catalog, request)
+        except Exception as e:
+            logger.error(f"Error autocompleting {request.prefix!r}: {e}")
+            return rag_pb2.AutocompleteResponse(error_message=str(e))
+
+    async def GetMetrics(self, request, context):
+        return metrics_response(self.rag_engine)
+
+
+async def serve_async(port: int = 50052):
+    # threads for the synchronous handlers (GetCourseInfo, Recommend, GetExplanation, ReloadCatalog)
+    grpc_max_workers = int(os.environ.get("GRPC_MAX_WORKERS", "10"))
+    grpc_max_concurrent_rpcs = int(os.environ.get("GRPC_MAX_CONCURRENT_RPCS", "0"))  # 0 means unlimited
+    admin_token = os.environ.get("ADMIN_TOKEN") or None  # unset disables ReloadCatalog
+
+    # catalog loading and index building block, so they run before the loop serves
+    rag_engine, courses, catalog_digest = await asyncio.to_thread(build_engine, True)
+    warmer = build_warmer(rag_engine)
+    catalog_watcher = build_catalog_watcher(rag_engine, catalog_digest)
+
+    server = grpc.aio.server(
+        migration_thread_pool=futures.ThreadPoolExecutor(max_workers=grpc_max_workers),
+        maximum_concurrent_rpcs=grpc_max_concurrent_rpcs or None,
+    )
+    rag_pb2_grpc.add_RAGServiceServicer_to_server(
+        AsyncRAGServicer(rag_engine, courses, warmer, catalog_watcher, admin_token), server
+    )
+    server.add_insecure_port(f"[::]:{port}")
+    await server.start()
+    logger.info(f"RAG gRPC server (asyncio) started on port {port}")
+    warmer.start()
+    catalog_watcher.start()
+    await server.wait_for_termination()
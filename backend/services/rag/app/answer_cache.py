@@ -0,0 +1,120 @@
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from itertools import count
+
+import numpy as np
+
+
+@dataclass
+class _Entry:
+    embedding: np.ndarray  # L2-normalized question embedding
+    sources_key: tuple[str, ...]
+    answer: str
+    expires_at: float
+
+
+class SemanticAnswerCache:
+    """Caches LLM answers for near-duplicate questions.
+
+    A lookup hits when a cached question retrieved the same set of source
+    courses and its embedding has cosine similarity >= `threshold` with the
+    new question. Entries are evicted LRU past `max_size`, expire after
+    `ttl_seconds`, and are all dropped when the index version changes.
+    """
+
+    def __init__(self, threshold: float = 0.95, max_size: int = 512, ttl_seconds: float = 3600.0):
+        self.threshold = threshold
+        self.max_size = max(1, max_size)
+        self.ttl_seconds = ttl_seconds
+        self.index_version = ""
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[int, _Entry] = OrderedDict()
+        # sources_key -> entry ids, so a lookup only compares against questions
+        # that retrieved the same courses
+        self._by_sources: dict[tuple[str, ...], set[int]] = {}
+        self._ids = count()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def sources_key(sources: list[dict]) -> tuple[str, ...]:
+        return tuple(sorted(source.get("course_code", "") for source in sources))
+
+    @staticmethod
+    def _normalize(embedding: list[float]) -> np.ndarray:
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def _check_version(self, index_version: str):
+        if index_version != self.index_version:
+            self._entries.clear()
+            self._by_sources.clear()
+            self.index_version = index_version
+
+    def _remove(self, entry_id: int):
+        entry = self._entries.pop(entry_id)
+        ids = self._by_sources.get(entry.sources_key)
+        if ids is not None:
+            ids.discard(entry_id)
+            if not ids:
+                del self._by_sources[entry.sources_key]
+
+    def get(self, embedding: list[float], sources: list[dict], index_version: str) -> str | None:
+        query = self._normalize(embedding)
+        key = self.sources_key(sources)
+        now = time.monotonic()
+
+        with self._lock:
+            self._check_version(index_version)
+
+            best_id, best_score = None, self.threshold
+            for entry_id in list(self._by_sources.get(key, ())):
+                entry = self._entries[entry_id]
+                if entry.expires_at < now:
+                    self._remove(entry_id)
+                    continue
+                score = float(entry.embedding @ query)
+                if score >= best_score:
+                    best_id, best_score = entry_id, score
+
+            if best_id is None:
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(best_id)
+            self.hits += 1
+            return self._entries[best_id].answer
+
+    def put(self, embedding: list[float], sources: list[dict], answer: str, index_version: str):
+        entry = _Entry(
+            embedding=self._normalize(embedding),
+            sources_key=self.sources_key(sources),
+            answer=answer,
+            expires_at=time.monotonic() + self.ttl_seconds,
+        )
+
+        with self._lock:
+            self._check_version(index_version)
+            entry_id = next(self._ids)
+            self._entries[entry_id] = entry
+            self._by_sources.setdefault(entry.sources_key, set()).add(entry_id)
+            while len(self._entries) > self.max_size:
+                self._remove(next(iter(self._entries)))
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._by_sources.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "index_version": self.index_version,
+        }
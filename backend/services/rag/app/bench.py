@@ -0,0 +1,400 @@
+"""Offline benchmarks for the RAG service.
+
+Run from the service directory, e.g.:
+
+    python -m app.bench quantization --docs 5000 --dim 768
+    python -m app.bench query --courses 3000 --requests 500 --concurrency 8
+    python -m app.bench query --server aio --requests 2000 --concurrency 300 --latency-ms 200
+    python -m app.bench load --sections 100000
+    python -m app.bench startup --sections 100000
+    python -m app.bench memory --courses 50000
+"""
+
+import argparse
+import asyncio
+import gc
+import json
+import multiprocessing
+import os
+import random
+import resource
+import tempfile
+import threading
+import time
+from concurrent import futures
+
+import grpc
+import numpy as np
+
+from app.catalog_snapshot import load_catalog
+from app.course_loader import Course, course_from_json, load_courses_from_json
+from app.aio_server import AsyncRAGServicer
+from app.generated import rag_pb2, rag_pb2_grpc
+from app.grpc_server import RAGServicer
+from app.index_backends import NumpyBackend
+from app.rag_engine import RAGEngine
+from app.vector_store import VectorStore
+
+SUBJECTS = [
+    ("COP", "Programming", ["python", "java", "software", "object oriented", "testing"]),
+    ("COT", "Theory", ["algorithms", "graphs", "complexity", "logic", "proofs"]),
+    ("CDA", "Computer Architecture", ["processors", "memory", "assembly", "pipelines", "caches"]),
+    ("CEN", "Software Engineering", ["requirements", "design", "agile", "teams", "projects"]),
+    ("CAP", "Applications", ["machine learning", "vision", "robotics", "data mining", "ai"]),
+    ("CNT", "Networking", ["protocols", "tcp", "routing", "security", "wireless"]),
+]
+DAYS = ["M", "T", "W", "R", "F"]
+TIMES = [("7:25 AM", "8:15 AM"), ("10:40 AM", "11:30 AM"), ("1:55 PM", "2:45 PM"), ("4:05 PM", "4:55 PM")]
+
+
+def synthetic_courses(n_courses: int, seed: int = 0) -> list[Course]:
+    rng = random.Random(seed)
+    courses = []
+    for i in range(n_courses):
+        prefix, area, topics = SUBJECTS[i % len(SUBJECTS)]
+        chosen = rng.sample(topics, 2)
+        code = f"{prefix}{1000 + i:04d}"
+        start, end = rng.choice(TIMES)
+        courses.append(Course(
+            code=code,
+            name=f"{area} {chosen[0].title()} {i}",
+            description=f"An introduction to {chosen[0]} and {chosen[1]} for {area.lower()} students.",
+            prerequisites=f"{prefix}{1000 + i - len(SUBJECTS):04d}" if i >= len(SUBJECTS) else "",
+            credits=rng.choice([1, 3, 3, 3, 4]),
+            department="Computer & Information Science & Engineering",
+            instructors=[f"Instructor {rng.randint(1, n_courses // 10 + 1)}"],
+            meeting_times=[{
+                "days": sorted(rng.sample(DAYS, 2), key=DAYS.index),
+                "time_begin": start,
+                "time_end": end,
+                "building": rng.choice(["CSE", "MAEA", "LIT", "NEB"]),
+                "room": str(rng.randint(100, 599)),
+            }],
+        ))
+    return courses
+
+
+def write_synthetic_course_json(path: str, n_sections: int, sections_per_course: int = 4, seed: int = 0):
+    """Write a course dump shaped like the UF schedule export, one course at a time."""
+    rng = random.Random(seed)
+    n_courses = max(1, n_sections // sections_per_course)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("[")
+        for i in range(n_courses):
+            prefix, area, topics = SUBJECTS[i % len(SUBJECTS)]
+            chosen = rng.sample(topics, 2)
+            sections = []
+            for j in range(sections_per_course):
+                start, end = rng.choice(TIMES)
+                sections.append({
+                    "number": f"{i:05d}{j}",
+                    "classNumber": 10000 + i * sections_per_course + j,
+                    "credits": rng.choice([1, 3, 3, 3, 4]),
+                    "deptName": "Computer & Information Science & Engineering",
+                    "instructors": [{"name": f"Instructor {rng.randint(1, n_courses // 10 + 1)}"}],
+                    "meetTimes": [{
+                        "meetDays": sorted(rng.sample(DAYS, 2), key=DAYS.index),
+                        "meetTimeBegin": start,
+                        "meetTimeEnd": end,
+                        "meetBuilding": rng.choice(["CSE", "MAEA", "LIT", "NEB"]),
+                        "meetRoom": str(rng.randint(100, 599)),
+                    }],
+                    "finalExam": "12/10/2026 @ 10:00 AM - 12:00 PM",
+                    "note": f"Section {j} of {area.lower()} {i}; see the department website for details.",
+                })
+            if i:
+                f.write(",")
+            json.dump({
+                "code": f"{prefix}{1000 + i:05d}",
+                "name": f"{area} {chosen[0].title()} {i}",
+                "description": f"An introduction to {chosen[0]} and {chosen[1]} for {area.lower()} students.",
+                "prerequisites": f"{prefix}{1000 + i - len(SUBJECTS):05d}" if i >= len(SUBJECTS) else "",
+                "sections": sections,
+            }, f)
+        f.write("]")
+
+
+def _peak_rss_mb() -> float:
+    # ru_maxrss is in KiB on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _measure_load(path: str, loader: str, results):
+    baseline = _peak_rss_mb()
+    start = time.perf_counter()
+    if loader == "json.load":
+        with open(path, "r", encoding="utf-8") as f:
+            courses = [course_from_json(course_data) for course_data in json.load(f)]
+    else:
+        courses = load_courses_from_json(path)
+    results.put((len(courses), time.perf_counter() - start, _peak_rss_mb() - baseline))
+
+
+def _rss_mb() -> float:
+    # current (not peak) resident set size, from /proc on Linux
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+
+
+def _measure_memory(path: str, results):
+    gc.collect()
+    baseline = _rss_mb()
+    courses = load_courses_from_json(path)
+    gc.collect()
+    loaded = _rss_mb() - baseline
+    for course in courses:
+        course.to_document()
+    gc.collect()
+    results.put((len(courses), loaded, _rss_mb() - baseline))
+
+
+def bench_memory(args):
+    context = multiprocessing.get_context("spawn")
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "courses.json")
+        write_synthetic_course_json(path, args.courses * args.sections_per_course, args.sections_per_course, args.seed)
+
+        results = context.Queue()
+        process = context.Process(target=_measure_memory, args=(path, results))
+        process.start()
+        n_courses, loaded_mb, rendered_mb = results.get()
+        process.join()
+
+    per_10k = 10_000 / n_courses
+    print(f"{n_courses} courses ({args.sections_per_course} sections each)")
+    print(f"RSS per 10k courses: {loaded_mb * per_10k:.1f} MB loaded, "
+          f"{rendered_mb * per_10k:.1f} MB with documents rendered")
+
+
+def bench_load(args):
+    # each loader runs in a fresh process so their peak RSS don't mask each other
+    context = multiprocessing.get_context("spawn")
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "courses.json")
+        write_synthetic_course_json(path, args.sections, args.sections_per_course, args.seed)
+        print(f"{args.sections} sections, {os.path.getsize(path) / 1e6:.1f} MB of JSON")
+        print(f"{'loader':<10} {'courses':>8} {'seconds':>8} {'peak MB':>8}")
+
+        for loader in ("json.load", "streaming"):
+            results = context.Queue()
+            process = context.Process(target=_measure_load, args=(path, loader, results))
+            process.start()
+            n_courses, elapsed, peak_mb = results.get()
+            process.join()
+            print(f"{loader:<10} {n_courses:>8} {elapsed:>8.2f} {peak_mb:>8.1f}")
+
+
+def _measure_startup(path: str, snapshot_path: str | None, results):
+    start = time.perf_counter()
+    courses, _ = load_catalog(path, snapshot_path)
+    # startup renders every document for the vector store; snapshots carry them
+    for course in courses:
+        course.to_document()
+    results.put((len(courses), time.perf_counter() - start))
+
+
+def bench_startup(args):
+    # catalog load as serve() does it, each run in a fresh interpreter
+    context = multiprocessing.get_context("spawn")
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "courses.json")
+        snapshot_path = path + ".snapshot"
+        write_synthetic_course_json(path, args.sections, args.sections_per_course, args.seed)
+        print(f"{args.sections} sections, {os.path.getsize(path) / 1e6:.1f} MB of JSON")
+        print(f"{'run':<24} {'courses':>8} {'seconds':>8}")
+
+        runs = [
+            ("json (no snapshot)", None),
+            ("json + write snapshot", snapshot_path),
+            ("snapshot", snapshot_path),
+        ]
+        for label, snapshot in runs:
+            results = context.Queue()
+            process = context.Process(target=_measure_startup, args=(path, snapshot, results))
+            process.start()
+            n_courses, elapsed = results.get()
+            process.join()
+            print(f"{label:<24} {n_courses:>8} {elapsed:>8.2f}")
+        print(f"snapshot size: {os.path.getsize(snapshot_path) / 1e6:.1f} MB")
+
+
+def _synthetic_embeddings(n_docs: int, dim: int, n_queries: int, seed: int) -> tuple[np.ndarray, np.ndarray]:
+    # clustered vectors look more like real course embeddings than uniform noise
+    rng = np.random.default_rng(seed)
+    n_clusters = max(1, n_docs // 50)
+    centers = rng.standard_normal((n_clusters, dim)).astype(np.float32)
+    docs = centers[rng.integers(0, n_clusters, n_docs)] + 0.35 * rng.standard_normal((n_docs, dim)).astype(np.float32)
+    queries = docs[rng.integers(0, n_docs, n_queries)] + 0.5 * rng.standard_normal((n_queries, dim)).astype(np.float32)
+    return docs, queries
+
+
+def bench_quantization(args):
+    docs, queries = _synthetic_embeddings(args.docs, args.dim, args.queries, args.seed)
+    ids = [f"DOC{i}" for i in range(args.docs)]
+    metadatas = [{"code": doc_id} for doc_id in ids]
+
+    with tempfile.TemporaryDirectory() as directory:
+        # every mode reads the same float32 file, so write it once
+        NumpyBackend(directory, "bench").upsert(ids, docs.tolist(), [""] * args.docs, metadatas)
+
+        exact = None
+        print(f"{args.docs} docs x {args.dim} dims, {args.queries} queries, k={args.k}")
+        print(f"{'mode':<8} {'scan MB':>9} {'vs f32':>7} {'recall@k':>9} {'ms/query':>9}")
+
+        for mode in NumpyBackend.QUANTIZATIONS:
+            backend = NumpyBackend(directory, "bench", quantization=mode)
+            usage = backend.memory_usage()
+
+            start = time.perf_counter()
+            results = [backend.query([q], args.k)[0] for q in queries.tolist()]
+            elapsed_ms = (time.perf_counter() - start) * 1000 / args.queries
+
+            found = [{hit["id"] for hit in hits} for hits in results]
+            if exact is None:
+                exact = found
+            recall = np.mean([len(f & e) / len(e) for f, e in zip(found, exact)])
+
+            print(
+                f"{mode:<8} {usage['scan_bytes'] / 1e6:>9.2f} "
+                f"{usage['scan_bytes'] / usage['float32_bytes']:>7.2f} "
+                f"{recall:>9.4f} {elapsed_ms:>9.3f}"
+            )
+
+
+def _start_threaded_server(engine: RAGEngine, courses: list[Course], workers: int):
+    server = grpc.server(futures.ThreadPoolExecutor(max_workers=workers))
+    rag_pb2_grpc.add_RAGServiceServicer_to_server(RAGServicer(engine, courses), server)
+    port = server.add_insecure_port("127.0.0.1:0")
+    server.start()
+    return port, lambda: server.stop(None)
+
+
+def _start_aio_server(engine: RAGEngine, courses: list[Course]):
+    # the server gets its own event loop thread so the client loop doesn't share it
+    loop = asyncio.new_event_loop()
+    threading.Thread(target=loop.run_forever, daemon=True).start()
+
+    async def start():
+        server = grpc.aio.server(migration_thread_pool=futures.ThreadPoolExecutor(max_workers=4))
+        rag_pb2_grpc.add_RAGServiceServicer_to_server(AsyncRAGServicer(engine, courses), server)
+        port = server.add_insecure_port("127.0.0.1:0")
+        await server.start()
+        return server, port
+
+    server, port = asyncio.run_coroutine_threadsafe(start(), loop).result()
+
+    def stop():
+        asyncio.run_coroutine_threadsafe(server.stop(None), loop).result()
+        loop.call_soon_threadsafe(loop.stop)
+
+    return port, stop
+
+
+async def _drive_queries(port: int, questions: list[str], requests: int, concurrency: int) -> tuple[list[float], float]:
+    """Send `requests` Query calls with `concurrency` in flight; returns (sorted latencies in ms, seconds)."""
+    async with grpc.aio.insecure_channel(f"127.0.0.1:{port}") as channel:
+        stub = rag_pb2_grpc.RAGServiceStub(channel)
+        await stub.Query(rag_pb2.QueryRequest(question=questions[0], max_results=5))  # connection setup
+
+        pending = iter(range(requests))
+        latencies = []
+
+        async def worker():
+            for i in pending:
+                t0 = time.perf_counter()
+                await stub.Query(rag_pb2.QueryRequest(question=questions[i % len(questions)], max_results=5))
+                latencies.append((time.perf_counter() - t0) * 1000)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        return sorted(latencies), time.perf_counter() - start
+
+
+def bench_query(args):
+    courses = synthetic_courses(args.courses, args.seed)
+    questions = [
+        f"Which courses cover {topic}?" for _, _, topics in SUBJECTS for topic in topics
+    ] + [f"What are the prerequisites for {c.code}?" for c in courses[:20]]
+
+    with tempfile.TemporaryDirectory() as directory:
+        start = time.perf_counter()
+        vector_store = VectorStore(
+            persist_directory=directory,
+            embedding_provider="offline",
+            embedding_model="hashing",
+            index_backend=args.backend,
+            search_mode=args.mode,
+        )
+        vector_store.add_courses(courses)
+        engine = RAGEngine(
+            vector_store=vector_store,
+            courses=courses,
+            llm_provider="offline",
+            offline_latency=args.latency_ms / 1000,
+        )
+        print(f"Indexed {len(courses)} courses in {time.perf_counter() - start:.2f}s ({args.backend}, {args.mode})")
+
+        if args.server == "aio":
+            port, stop = _start_aio_server(engine, courses)
+        else:
+            port, stop = _start_threaded_server(engine, courses, args.concurrency)
+
+        try:
+            latencies, elapsed = asyncio.run(_drive_queries(port, questions, args.requests, args.concurrency))
+        finally:
+            stop()
+
+    print(
+        f"{args.requests} requests, concurrency {args.concurrency} ({args.server} server): "
+        f"{args.requests / elapsed:.0f} req/s, "
+        f"p50 {np.percentile(latencies, 50):.2f}ms, p99 {np.percentile(latencies, 99):.2f}ms"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="RAG service benchmarks")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    quant = subparsers.add_parser("quantization", help="memory and recall@k of each vector quantization mode")
+    quant.add_argument("--docs", type=int, default=5000)
+    quant.add_argument("--dim", type=int, default=768)
+    quant.add_argument("--queries", type=int, default=200)
+    quant.add_argument("-k", type=int, default=10)
+    quant.add_argument("--seed", type=int, default=0)
+    quant.set_defaults(func=bench_quantization)
+
+    query = subparsers.add_parser("query", help="end-to-end Query RPC throughput with offline providers")
+    query.add_argument("--courses", type=int, default=3000)
+    query.add_argument("--requests", type=int, default=500)
+    query.add_argument("--concurrency", type=int, default=8)
+    query.add_argument("--backend", choices=["chroma", "numpy"], default="numpy")
+    query.add_argument("--mode", choices=["vector", "lexical", "hybrid"], default="hybrid")
+    query.add_argument("--latency-ms", type=float, default=0.0, help="simulated chat latency")
+    query.add_argument("--server", choices=["threaded", "aio"], default="threaded")
+    query.add_argument("--seed", type=int, default=0)
+    query.set_defaults(func=bench_query)
+
+    load = subparsers.add_parser("load", help="time and peak RSS of loading a course JSON dump")
+    load.add_argument("--sections", type=int, default=100_000)
+    load.add_argument("--sections-per-course", type=int, default=4)
+    load.add_argument("--seed", type=int, default=0)
+    load.set_defaults(func=bench_load)
+
+    memory = subparsers.add_parser("memory", help="resident memory of the loaded course catalog")
+    memory.add_argument("--courses", type=int, default=50_000)
+    memory.add_argument("--sections-per-course", type=int, default=4)
+    memory.add_argument("--seed", type=int, default=0)
+    memory.set_defaults(func=bench_memory)
+
+    startup = subparsers.add_parser("startup", help="cold catalog load from JSON versus from a snapshot")
+    startup.add_argument("--sections", type=int, default=100_000)
+    startup.add_argument("--sections-per-course", type=int, default=4)
+    startup.add_argument("--seed", type=int, default=0)
+    startup.set_defaults(func=bench_startup)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,33 @@
+from dataclasses import dataclass
+
+from app.course_loader import Course, CourseCatalog
+from app.rules import PreparedCourse, build_recommendation_index
+
+
+def _rules_course(course: Course) -> dict:
+    """Dict form of a course as the rules engine expects it."""
+    return {
+        "code": course.code,
+        "name": course.name,
+        "title": course.name,
+        "description": course.description,
+        "prerequisites": course.prerequisites,
+        "credits": course.credits,
+        "department": course.department,
+    }
+
+
+@dataclass
+class CourseIndexes:
+    """Lookup structures derived from the course catalog."""
+    catalog: CourseCatalog
+    # the rules engine's per-course work (prereq parsing, text lowering) is
+    # independent of the student, so it is done once per catalog
+    recommendation_index: list[PreparedCourse]
+
+    @classmethod
+    def build(cls, courses: list[Course]) -> "CourseIndexes":
+        return cls(
+            catalog=CourseCatalog(courses),
+            recommendation_index=build_recommendation_index([_rules_course(course) for course in courses]),
+        )
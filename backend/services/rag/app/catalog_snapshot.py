@@ -0,0 +1,111 @@
+"""Binary snapshots of the parsed course catalog.
+
+Parsing courses.json, building each `Course`, rendering its document and
+indexing the catalog dominate a cold start. A snapshot stores the result as
+one pickle behind a small header holding the SHA-256 of the source file, so
+a restart with an unchanged catalog reads it back in a single read. Any
+mismatch or unreadable snapshot falls back to the JSON file and rewrites the
+snapshot. Snapshots are trusted like the catalog itself: keep them somewhere
+only the service writes.
+"""
+
+import gc
+import hashlib
+import logging
+import os
+import pickle
+import struct
+import time
+from pathlib import Path
+
+from app.catalog import CourseIndexes
+from app.course_loader import Course, load_courses_from_json
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_MAGIC = b"RAGCATALOG"
+# bump whenever Course, CourseCatalog, CourseIndexes or PreparedCourse change shape or module
+SNAPSHOT_VERSION = 4
+HEADER = struct.Struct("<10sH32s")  # magic, version, sha256 of the source file
+
+
+def source_digest(path: Path, chunk_size: int = 1 << 20) -> bytes:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(chunk_size):
+            digest.update(chunk)
+    return digest.digest()
+
+
+def read_snapshot(path: Path, digest: bytes) -> tuple[list[Course], CourseIndexes] | None:
+    """Return the snapshot's (courses, indexes), or None if it is missing or was built from other data."""
+    try:
+        data = Path(path).read_bytes()
+    except FileNotFoundError:
+        return None
+
+    if len(data) < HEADER.size:
+        return None
+    magic, version, snapshot_digest = HEADER.unpack_from(data)
+    if magic != SNAPSHOT_MAGIC or version != SNAPSHOT_VERSION or snapshot_digest != digest:
+        return None
+
+    # unpickling allocates millions of long-lived objects; the cyclic GC
+    # passes this triggers find nothing and more than double the load time
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        return pickle.loads(memoryview(data)[HEADER.size:])
+    finally:
+        if gc_enabled:
+            gc.enable()
+
+
+def write_snapshot(path: Path, digest: bytes, courses: list[Course], indexes: CourseIndexes):
+    # render every document so restarts don't redo it
+    for course in courses:
+        course.to_document()
+
+    path = Path(path)
+    tmp_path = path.with_name(f".{path.name}.tmp")
+    with open(tmp_path, "wb") as f:
+        f.write(HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, digest))
+        pickle.dump((courses, indexes), f, protocol=pickle.HIGHEST_PROTOCOL)
+    # readers see the old snapshot or the complete new one, never a partial file
+    os.replace(tmp_path, path)
+
+
+def load_catalog(
+    source: Path,
+    snapshot_path: Path | None = None,
+    digest: bytes | None = None,
+) -> tuple[list[Course], CourseIndexes]:
+    """Load the course catalog and its indexes, from `snapshot_path` when it matches `source`.
+
+    Without a `snapshot_path` the JSON file is always parsed. `digest` is
+    the caller's `source_digest(source)`, taken before the call so that a
+    change made while loading is seen as a change later.
+    """
+    if not snapshot_path:
+        courses = load_courses_from_json(source)
+        return courses, CourseIndexes.build(courses)
+
+    start = time.perf_counter()
+    digest = digest or source_digest(source)
+    try:
+        loaded = read_snapshot(snapshot_path, digest)
+    except Exception as e:
+        logger.warning(f"Ignoring unreadable catalog snapshot {snapshot_path}: {e}")
+        loaded = None
+    if loaded is not None:
+        logger.info(f"Loaded catalog snapshot {snapshot_path} in {time.perf_counter() - start:.2f}s")
+        return loaded
+
+    courses = load_courses_from_json(source)
+    indexes = CourseIndexes.build(courses)
+    logger.info(f"Parsed {source} in {time.perf_counter() - start:.2f}s; writing snapshot {snapshot_path}")
+    try:
+        write_snapshot(snapshot_path, digest, courses, indexes)
+    except OSError as e:
+        logger.warning(f"Could not write catalog snapshot {snapshot_path}: {e}")
+    return courses, indexes
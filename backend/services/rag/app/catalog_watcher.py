@@ -0,0 +1,132 @@
+import logging
+import os
+import threading
+import time
+from concurrent.futures import Future
+from pathlib import Path
+
+from app.catalog_snapshot import load_catalog, source_digest
+from app.rag_engine import RAGEngine
+
+logger = logging.getLogger(__name__)
+
+
+class CatalogWatcher:
+    """Reloads the course catalog when its JSON file changes, without a restart.
+
+    `start()` polls the file's size, mtime and inode every `poll_interval`
+    seconds and reloads once they have held still for a full interval, so a
+    file that is still being written is not picked up halfway. `reload()`
+    does the same on demand. A reload parses the file (or its snapshot) and
+    builds the new index version beside the live one, re-embedding only
+    documents whose content changed; then the index and the catalog are
+    swapped in. Requests in flight finish on whichever version they started
+    with, and a failed reload leaves the old catalog serving.
+    """
+
+    def __init__(
+        self,
+        rag_engine: RAGEngine,
+        source: Path,
+        snapshot_path: Path | None = None,
+        poll_interval: float = 30.0,
+        digest: bytes | None = None,
+    ):
+        self.rag_engine = rag_engine
+        self.source = Path(source)
+        self.snapshot_path = snapshot_path
+        self.poll_interval = poll_interval
+        # content the live catalog was loaded from, as hashed before loading it;
+        # touching the file alone doesn't reload
+        self._digest = digest if digest is not None else source_digest(self.source)
+        # unknown: the file may have changed since it was loaded, so the first
+        # settled poll compares its content with `digest`
+        self._stat = None
+        self._pending: Future | None = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> threading.Thread | None:
+        if self.poll_interval <= 0:
+            return None
+        self._thread = threading.Thread(target=self._run, name="catalog-watcher", daemon=True)
+        self._thread.start()
+        return self._thread
+
+    def stop(self):
+        self._stop.set()
+
+    def reload(self, force: bool = False) -> Future:
+        """Reload in the background; the future resolves to a summary dict.
+
+        A request made while a reload is running joins it. Without `force`, a
+        file whose content is unchanged is left alone.
+        """
+        with self._lock:
+            if self._pending is not None and not self._pending.done():
+                return self._pending
+            future: Future = Future()
+            self._pending = future
+
+        def run():
+            try:
+                future.set_result(self._reload(force))
+            except Exception as e:
+                logger.error(f"Catalog reload failed, still serving '{self.rag_engine.vector_store.index_version}': {e}")
+                future.set_exception(e)
+
+        threading.Thread(target=run, name="catalog-reload", daemon=True).start()
+        return future
+
+    def _reload(self, force: bool) -> dict:
+        vector_store = self.rag_engine.vector_store
+        digest = source_digest(self.source)
+        if digest == self._digest and not force:
+            return {
+                "reloaded": False,
+                "courses": len(self.rag_engine.courses),
+                "index_version": vector_store.index_version,
+            }
+
+        start = time.perf_counter()
+        courses, indexes = load_catalog(self.source, self.snapshot_path, digest)
+        # the catalog is published at the moment the matching index version goes
+        # live, so queries never pin or recommend from a catalog the index doesn't hold
+        vector_store.add_courses(courses, on_swap=lambda: self.rag_engine.set_courses(courses, indexes))
+        self._digest = digest
+
+        logger.info(
+            f"Reloaded {len(courses)} courses from {self.source} in {time.perf_counter() - start:.2f}s "
+            f"(index '{vector_store.index_version}')"
+        )
+        return {
+            "reloaded": True,
+            "courses": len(courses),
+            "index_version": vector_store.index_version,
+        }
+
+    def _stat_source(self) -> tuple[int, int, int] | None:
+        try:
+            stat = os.stat(self.source)
+        except FileNotFoundError:
+            # mid-replace; the next poll sees the new file
+            return None
+        return stat.st_mtime_ns, stat.st_size, stat.st_ino
+
+    def _run(self):
+        previous = self._stat
+        while not self._stop.wait(self.poll_interval):
+            current = self._stat_source()
+            settled = current == previous
+            previous = current
+            if current is None or not settled or current == self._stat:
+                continue
+
+            if self._stat is not None:
+                logger.info(f"Course data {self.source} changed; reloading the catalog")
+            self._stat = current
+            try:
+                self.reload().result()
+            except Exception:
+                pass  # logged by reload(); the next change tries again
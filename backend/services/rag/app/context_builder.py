@@ -0,0 +1,168 @@
+import re
+from dataclasses import dataclass
+
+# "Label: value" lines as written by Course.to_document
+FIELD_LINE_RE = re.compile(r"^([A-Z][A-Za-z ]{1,30}): (.*)$")
+WORD_RE = re.compile(r"[a-z]+")
+
+HEADER_FIELD = "Course"
+DEFAULT_FIELDS = ("Credits", "Description", "Prerequisites")
+# word prefixes in the question that ask for a field
+FIELD_KEYWORDS = {
+    "Prerequisites": ("prereq", "requir", "before", "need", "eligib"),
+    "Instructors": ("instructor", "professor", "prof", "teach", "taught", "lectur"),
+    "Meeting Times": (
+        "when", "time", "schedul", "day", "meet", "morning", "afternoon", "evening", "night",
+        "monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "weekend",
+    ),
+    "Department": ("department", "dept", "college", "major"),
+    "Credits": ("credit", "hour", "workload"),
+}
+# metadata filter keys and the document field each one matches on
+FILTER_FIELDS = {"department": "Department", "credits": "Credits"}
+# question words too common to say why a field matched
+STOP_WORDS = frozenset({
+    "about", "all", "and", "any", "are", "can", "class", "classes", "course", "courses", "does",
+    "for", "from", "has", "have", "how", "into", "that", "the", "there", "this", "what", "which",
+    "who", "with",
+})
+# fields holding lists whose items can repeat (one entry per section)
+LIST_SEPARATORS = {"Instructors": ", ", "Meeting Times": "; "}
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token for English prose)."""
+    return (len(text) + 3) // 4
+
+
+def parse_document(document: str) -> list[tuple[str, str]]:
+    """Split a course document into (label, value) fields, keeping their order."""
+    fields: list[tuple[str, str]] = []
+    for line in document.splitlines():
+        match = FIELD_LINE_RE.match(line)
+        if match:
+            fields.append((match.group(1), match.group(2)))
+        elif fields:
+            label, value = fields[-1]
+            fields[-1] = (label, f"{value}\n{line}")
+        elif line.strip():
+            fields.append(("", line))
+    return fields
+
+
+def fields_for_question(question: str, filters: dict | None = None) -> set[str]:
+    """Fields every hit keeps: the defaults, those the question asks about and those filtered on."""
+    words = WORD_RE.findall(question.lower())
+    wanted = set(DEFAULT_FIELDS)
+    for field, prefixes in FIELD_KEYWORDS.items():
+        if any(word.startswith(prefixes) for word in words):
+            wanted.add(field)
+    for key in filters or ():
+        if key in FILTER_FIELDS:
+            wanted.add(FILTER_FIELDS[key])
+    return wanted
+
+
+def question_terms(question: str) -> set[str]:
+    return {word for word in WORD_RE.findall(question.lower()) if len(word) > 2 and word not in STOP_WORDS}
+
+
+def _mentions(value: str, terms: set[str]) -> bool:
+    return bool(terms) and not terms.isdisjoint(WORD_RE.findall(value.lower()))
+
+
+def _dedupe_items(label: str, value: str) -> str:
+    separator = LIST_SEPARATORS.get(label)
+    if not separator:
+        return value
+    return separator.join(dict.fromkeys(item for item in value.split(separator) if item))
+
+
+@dataclass
+class BuiltContext:
+    text: str
+    used_sources: int
+    dropped_sources: int
+    tokens: int
+    dropped_tokens: int  # versus concatenating every hit's full document
+
+
+class ContextBuilder:
+    """Assembles the "Course Information" block of a prompt within a token budget.
+
+    Hits are taken in the order given (most relevant first) and only the
+    fields the question asks about or the request filters on are kept, plus
+    any field whose value contains a word of the question, since that is
+    often why lexical search matched the hit (e.g. an instructor's surname).
+    Hits under `min_relevance`, or
+    that no longer fit in `token_budget`, are dropped; the first hit is always
+    kept, truncated if needed. Fields that are identical across every kept
+    hit are written once. A `token_budget` of 0 means no limit.
+    """
+
+    def __init__(self, token_budget: int = 1500, min_relevance: float = 0.0):
+        self.token_budget = max(0, token_budget)
+        self.min_relevance = min_relevance
+
+    def build(self, question: str, hits: list[dict], filters: dict | None = None) -> BuiltContext:
+        full = "\n\n".join(f"[Course {i}]\n{hit['content']}" for i, hit in enumerate(hits, 1))
+        wanted = fields_for_question(question, filters)
+        terms = question_terms(question)
+
+        selected: list[list[tuple[str, str]]] = []
+        for hit in hits:
+            if selected and hit.get("relevance_score", 0.0) < self.min_relevance:
+                continue
+            selected.append([
+                (label, _dedupe_items(label, value))
+                for label, value in parse_document(hit["content"])
+                if label in (HEADER_FIELD, "") or label in wanted or _mentions(value, terms)
+            ])
+
+        selected, shared = self._split_shared(selected)
+        text, used_sources = self._fit(selected, shared)
+        tokens = estimate_tokens(text)
+
+        return BuiltContext(
+            text=text,
+            used_sources=used_sources,
+            dropped_sources=len(hits) - used_sources,
+            tokens=tokens,
+            dropped_tokens=max(0, estimate_tokens(full) - tokens),
+        )
+
+    @staticmethod
+    def _split_shared(selected: list[list[tuple[str, str]]]) -> tuple[list[list[tuple[str, str]]], list[tuple[str, str]]]:
+        if len(selected) < 2:
+            return selected, []
+
+        common = set(selected[0]).intersection(*selected[1:])
+        shared = [field for field in selected[0] if field in common and field[0] not in (HEADER_FIELD, "")]
+        if not shared:
+            return selected, []
+
+        drop = set(shared)
+        return [[field for field in fields if field not in drop] for fields in selected], shared
+
+    def _fit(self, selected: list[list[tuple[str, str]]], shared: list[tuple[str, str]]) -> tuple[str, int]:
+        parts = []
+        used_sources = 0
+        if shared:
+            parts.append("[All courses below]\n" + "\n".join(f"{label}: {value}" for label, value in shared))
+
+        used = estimate_tokens("\n\n".join(parts))
+        for i, fields in enumerate(selected, 1):
+            block = f"[Course {i}]\n" + "\n".join(
+                f"{label}: {value}" if label else value for label, value in fields
+            )
+            cost = estimate_tokens(block) + 1  # the "\n\n" separator
+            if self.token_budget and used + cost > self.token_budget:
+                if i == 1:
+                    parts.append(block[: max(0, self.token_budget - used) * 4])
+                    used_sources = 1
+                break
+            parts.append(block)
+            used += cost
+            used_sources += 1
+
+        return "\n\n".join(parts), used_sources
@@ -1,21 +1,151 @@
+import bisect
+import functools
 import json
+import re
+import sys
 from pathlib import Path
-from typing import Optional
-from dataclasses import dataclass
+from typing import Iterator, NamedTuple, Optional, Union
+from dataclasses import dataclass, field
 
 
-@dataclass
+# UF course codes: 3-letter prefix, 4 digits, optional lab/suffix letter (e.g. "COP3530", "PHY 2048L")
+COURSE_CODE_RE = re.compile(r"\b([A-Za-z]{3})\s?(\d{4}[A-Za-z]?)\b")
+TITLE_WORD_RE = re.compile(r"[a-z0-9]+")
+# meeting times as the UF schedule writes them, e.g. "1:55 PM"
+CLOCK_TIME_RE = re.compile(r"^(1[0-2]|[1-9]):([0-5]\d) ([AP]M)$")
+DAY_CODES = ("M", "T", "W", "R", "F", "S", "U")
+
+
+def normalize_course_code(code: str) -> str:
+    return code.upper().replace(' ', '')
+
+
+def extract_course_codes(text: str) -> list[str]:
+    """Return the normalized course codes mentioned in `text`, in order of first mention."""
+    codes = []
+    for prefix, number in COURSE_CODE_RE.findall(text):
+        code = normalize_course_code(prefix + number)
+        if code not in codes:
+            codes.append(code)
+    return codes
+
+
+def _intern(text: str) -> str:
+    return sys.intern(text) if isinstance(text, str) else text
+
+
+def _days_to_mask(days: list[str]) -> Union[int, tuple[str, ...]]:
+    """Bitmask over DAY_CODES, or the codes themselves when a mask can't reproduce them."""
+    mask = 0
+    for day in days:
+        bit = 1 << DAY_CODES.index(day) if day in DAY_CODES else 0
+        if bit <= mask:  # unknown, repeated or out of order
+            return tuple(_intern(d) for d in days)
+        mask |= bit
+    return mask
+
+
+@functools.lru_cache(maxsize=4096)  # a catalog uses a few hundred distinct times
+def _clock_to_minutes(text: str) -> Union[int, str]:
+    """Minutes after midnight (-1 for no time), or the text itself when it isn't a plain clock time."""
+    if not text:
+        return -1
+    match = CLOCK_TIME_RE.match(text)
+    if not match:
+        return _intern(text)
+    hour, minute, half = int(match.group(1)) % 12, int(match.group(2)), match.group(3)
+    return (hour + (12 if half == "PM" else 0)) * 60 + minute
+
+
+def _minutes_to_clock(minutes: Union[int, str]) -> str:
+    if isinstance(minutes, str):
+        return minutes
+    if minutes < 0:
+        return ""
+    hour, minute = divmod(minutes, 60)
+    return f"{hour % 12 or 12}:{minute:02d} {'PM' if hour >= 12 else 'AM'}"
+
+
+class MeetingTime(NamedTuple):
+    """One weekly meeting, stored compactly.
+
+    Days are a bitmask over DAY_CODES and times are minutes after midnight.
+    Values those can't reproduce exactly (odd day lists, "TBA") are kept
+    as given, so `to_dict()` always returns the original fields.
+    """
+    days: Union[int, tuple[str, ...]]
+    begin: Union[int, str]
+    end: Union[int, str]
+    building: str
+    room: str
+
+    @classmethod
+    def from_dict(cls, mt: dict) -> "MeetingTime":
+        return cls(
+            days=_days_to_mask(mt.get('days', [])),
+            begin=_clock_to_minutes(mt.get('time_begin', '')),
+            end=_clock_to_minutes(mt.get('time_end', '')),
+            building=_intern(mt.get('building', '')),
+            room=_intern(mt.get('room', '')),
+        )
+
+    @property
+    def day_codes(self) -> list[str]:
+        if isinstance(self.days, tuple):
+            return list(self.days)
+        return [day for i, day in enumerate(DAY_CODES) if self.days >> i & 1]
+
+    @property
+    def time_begin(self) -> str:
+        return _minutes_to_clock(self.begin)
+
+    @property
+    def time_end(self) -> str:
+        return _minutes_to_clock(self.end)
+
+    def to_dict(self) -> dict:
+        return {
+            'days': self.day_codes,
+            'time_begin': self.time_begin,
+            'time_end': self.time_end,
+            'building': self.building,
+            'room': self.room,
+        }
+
+
+@dataclass(slots=True)
 class Course:
+    """A catalog course.
+
+    Slotted, with strings that repeat across courses (department,
+    instructors, buildings, rooms) interned and meeting times stored as
+    `MeetingTime` tuples; dicts passed as `meeting_times` are converted.
+    """
     code: str
     name: str
     description: str
     prerequisites: str
     credits: int
     department: str
-    instructors: list[str]
-    meeting_times: list[dict]
+    instructors: tuple[str, ...]
+    meeting_times: tuple[MeetingTime, ...]
+    # rendered once: the vector store, pinning and catalog snapshots all reuse it
+    _document: str = field(default="", init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        self.department = _intern(self.department)
+        self.instructors = tuple(_intern(name) for name in self.instructors)
+        self.meeting_times = tuple(
+            mt if isinstance(mt, MeetingTime) else MeetingTime.from_dict(mt)
+            for mt in self.meeting_times
+        )
 
     def to_document(self) -> str:
+        if not self._document:
+            self._document = self._render_document()
+        return self._document
+
+    def _render_document(self) -> str:
         # make to document string for future embedding
         parts = [
             f"Course: {self.code} - {self.name}",
@@ -35,66 +165,256 @@ class Course:
         if self.meeting_times:
             times = []
             for mt in self.meeting_times:
-                days = ', '.join(mt.get('days', []))
-                time_str = f"{mt.get('time_begin', '')} - {mt.get('time_end', '')}"
+                days = ', '.join(mt.day_codes)
+                time_str = f"{mt.time_begin} - {mt.time_end}"
                 times.append(f"{days} {time_str}")
             parts.append(f"Meeting Times: {'; '.join(times)}")
 
         return "\n".join(parts)
 
 
-def load_courses_from_json(file_path: Path) -> list[Course]:
+def iter_json_array(file_path: Path, chunk_size: int = 1 << 16) -> Iterator:
+    """Yield the items of a top-level JSON array one at a time.
+
+    The file is read in `chunk_size` pieces and each item is decoded with
+    `JSONDecoder.raw_decode`, so memory holds one item plus a chunk rather
+    than the whole parsed document.
+    """
+    decoder = json.JSONDecoder()
     with open(file_path, 'r', encoding='utf-8') as f:
-        data = json.load(f)
-
-    courses = []
-    for course_data in data:
-        instructors = set()
-        meeting_times = []
-        credits = 0
-        department = ""
-
-        for section in course_data.get('sections', []):
-            if not credits:
-                credits = section.get('credits', 0)
-
-            if not department:
-                department = section.get('deptName', '')
-
-            for instructor in section.get('instructors', []):
-                name = instructor.get('name', '')
-                if name:
-                    instructors.add(name)
-
-            if not meeting_times:
-                for mt in section.get('meetTimes', []):
-                    meeting_times.append({
-                        'days': mt.get('meetDays', []),
-                        'time_begin': mt.get('meetTimeBegin', ''),
-                        'time_end': mt.get('meetTimeEnd', ''),
-                        'building': mt.get('meetBuilding', ''),
-                        'room': mt.get('meetRoom', ''),
-                    })
-
-        course = Course(
-            code=course_data.get('code', ''),
-            name=course_data.get('name', ''),
-            description=course_data.get('description', ''),
-            prerequisites=course_data.get('prerequisites', ''),
-            credits=credits,
-            department=department,
-            instructors=list(instructors),
-            meeting_times=meeting_times,
-        )
-        courses.append(course)
+        buffer = f.read(chunk_size)
+        pos = 0
+        eof = not buffer
+        read_size = chunk_size
+        started = False
+        after_item = False
+        after_comma = False
+
+        while True:
+            # skip whitespace, reading on when the buffer runs out
+            while True:
+                while pos < len(buffer) and buffer[pos] in ' \t\r\n':
+                    pos += 1
+                if pos < len(buffer) or eof:
+                    break
+                buffer, pos = f.read(chunk_size), 0
+                eof = not buffer
+
+            if pos >= len(buffer):
+                raise ValueError(f"{file_path}: unexpected end of file inside the JSON array" if started
+                                 else f"{file_path}: expected a JSON array, found an empty file")
+            char = buffer[pos]
+            if not started:
+                if char != '[':
+                    raise ValueError(f"{file_path}: expected a JSON array at the top level")
+                started = True
+                pos += 1
+                continue
+            if char == ']':
+                if after_comma:
+                    raise ValueError(f"{file_path}: expected an array item after ','")
+                # like json.load, reject anything but whitespace after the array
+                rest = buffer[pos + 1:]
+                while True:
+                    if rest.strip(' \t\r\n'):
+                        raise ValueError(f"{file_path}: unexpected data after the JSON array")
+                    rest = f.read(chunk_size)
+                    if not rest:
+                        return
+            if after_item:
+                if char != ',':
+                    raise ValueError(f"{file_path}: expected ',' or ']' between array items")
+                after_item = False
+                after_comma = True
+                pos += 1
+                continue
+
+            try:
+                item, end = decoder.raw_decode(buffer, pos)
+                # strings, objects and arrays end at their closing character, but a
+                # number or literal cut off by the chunk boundary still decodes
+                # ("12" of "12e5"), so it only counts once a delimiter follows it
+                complete = (
+                    eof
+                    or char in '{["'
+                    or (end < len(buffer) and buffer[end] in ' \t\r\n,]')
+                )
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+                complete = False
+
+            if complete:
+                read_size = chunk_size
+                pos = end
+                after_item = True
+                after_comma = False
+                yield item
+                continue
+
+            # the item spans chunks: keep its start and read more, growing the
+            # read so an oversized item is not re-decoded once per chunk
+            more = f.read(read_size)
+            eof = not more
+            buffer = buffer[pos:] + more
+            pos = 0
+            read_size *= 2
+
+
+def course_from_json(course_data: dict) -> Course:
+    # first-seen order; a set's order changes with the hash seed, and with it
+    # every document and content hash
+    instructors: dict[str, None] = {}
+    meeting_times = []
+    credits = 0
+    department = ""
+
+    for section in course_data.get('sections', []):
+        if not credits:
+            credits = section.get('credits', 0)
+
+        if not department:
+            department = section.get('deptName', '')
+
+        for instructor in section.get('instructors', []):
+            name = instructor.get('name', '')
+            if name:
+                instructors.setdefault(name)
+
+        if not meeting_times:
+            for mt in section.get('meetTimes', []):
+                meeting_times.append({
+                    'days': mt.get('meetDays', []),
+                    'time_begin': mt.get('meetTimeBegin', ''),
+                    'time_end': mt.get('meetTimeEnd', ''),
+                    'building': mt.get('meetBuilding', ''),
+                    'room': mt.get('meetRoom', ''),
+                })
+
+    return Course(
+        code=course_data.get('code', ''),
+        name=course_data.get('name', ''),
+        description=course_data.get('description', ''),
+        prerequisites=course_data.get('prerequisites', ''),
+        credits=credits,
+        department=department,
+        instructors=list(instructors),
+        meeting_times=meeting_times,
+    )
+
+
+def load_courses_from_json(file_path: Path) -> list[Course]:
+    # each course's raw section data is dropped as soon as its Course is built
+    return [course_from_json(course_data) for course_data in iter_json_array(file_path)]
+
+
+def lookup_key(text: str) -> str:
+    # department and instructor names compare case- and whitespace-insensitively,
+    # here and in search filters
+    return " ".join(text.casefold().split())
+
+
+def _title_key(text: str) -> str:
+    return " ".join(TITLE_WORD_RE.findall(text.lower()))
+
+
+class CourseCatalog:
+    """In-memory lookups over the course catalog, indexed once at construction.
+
+    Codes, departments and instructors are hash lookups. Autocomplete uses two
+    sorted key lists searched with `bisect`: normalized codes, and every word
+    suffix of each title ("data structures", "structures"), so a prefix
+    matches the start of any title word. Duplicate codes keep the first
+    occurrence, like the vector store does.
+    """
+
+    def __init__(self, courses: list[Course]):
+        self.courses: list[Course] = []
+        self._by_code: dict[str, Course] = {}
+        self._by_department: dict[str, list[int]] = {}
+        self._by_instructor: dict[str, list[int]] = {}
+        code_keys: list[tuple[str, int]] = []
+        title_keys: list[tuple[str, int]] = []
+
+        for course in courses:
+            code = normalize_course_code(course.code)
+            if not code or code in self._by_code:
+                continue
+            position = len(self.courses)
+            self.courses.append(course)
+            self._by_code[code] = course
+
+            if course.department:
+                self._by_department.setdefault(lookup_key(course.department), []).append(position)
+            for instructor in dict.fromkeys(lookup_key(name) for name in course.instructors):
+                self._by_instructor.setdefault(instructor, []).append(position)
+
+            code_keys.append((code, position))
+            words = _title_key(course.name).split()
+            title_keys.extend((" ".join(words[i:]), position) for i in range(len(words)))
+
+        code_keys.sort()
+        title_keys.sort()
+        self._code_keys = [key for key, _ in code_keys]
+        self._code_positions = [position for _, position in code_keys]
+        self._title_keys = [key for key, _ in title_keys]
+        self._title_positions = [position for _, position in title_keys]
+
+    def __len__(self) -> int:
+        return len(self.courses)
+
+    def __iter__(self):
+        return iter(self.courses)
+
+    def get(self, code: str) -> Optional[Course]:
+        return self._by_code.get(normalize_course_code(code))
+
+    def by_department(self, department: str) -> list[Course]:
+        return [self.courses[i] for i in self._by_department.get(lookup_key(department), [])]
+
+    def by_instructor(self, instructor: str) -> list[Course]:
+        return [self.courses[i] for i in self._by_instructor.get(lookup_key(instructor), [])]
+
+    def search(self, department: str = "", instructor: str = "", code_prefix: str = "") -> list[Course]:
+        """Courses matching every given criterion, in catalog order (no criteria: all courses)."""
+        candidates: Optional[set[int]] = None
+        if department:
+            candidates = set(self._by_department.get(lookup_key(department), []))
+        if instructor:
+            matches = self._by_instructor.get(lookup_key(instructor), [])
+            candidates = set(matches) if candidates is None else candidates.intersection(matches)
+        if code_prefix:
+            matches = self._prefix_range(self._code_keys, self._code_positions, normalize_course_code(code_prefix))
+            candidates = set(matches) if candidates is None else candidates.intersection(matches)
+
+        if candidates is None:
+            return list(self.courses)
+        return [self.courses[i] for i in sorted(candidates)]
 
-    return courses
+    def autocomplete(self, prefix: str, limit: int = 10) -> list[Course]:
+        """Courses whose code, or any word of whose title, starts with `prefix`; code matches first."""
+        code_prefix = normalize_course_code(prefix)
+        title_prefix = _title_key(prefix)
+        if not code_prefix or limit <= 0:
+            return []
 
+        seen: dict[int, None] = {}
+        for keys, positions, key in (
+            (self._code_keys, self._code_positions, code_prefix),
+            (self._title_keys, self._title_positions, title_prefix),
+        ):
+            if not key:
+                continue
+            for position in self._prefix_range(keys, positions, key):
+                seen.setdefault(position)
+                if len(seen) >= limit:
+                    return [self.courses[i] for i in seen]
+        return [self.courses[i] for i in seen]
 
-def get_course_by_code(courses: list[Course], code: str) -> Optional[Course]:
-    # Find course by code
-    code_upper = code.upper().replace(' ', '')
-    for course in courses:
-        if course.code.upper().replace(' ', '') == code_upper:
-            return course
-    return None
+    @staticmethod
+    def _prefix_range(keys: list[str], positions: list[int], prefix: str):
+        """Yield the positions of keys starting with `prefix`, in key order."""
+        i = bisect.bisect_left(keys, prefix)
+        while i < len(keys) and keys[i].startswith(prefix):
+            yield positions[i]
+            i += 1
@@ -0,0 +1,145 @@
+import hashlib
+import logging
+import sqlite3
+import threading
+import time
+from array import array
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+# eviction trims the cache to this fraction of max_entries, so a full cache
+# isn't recounted and trimmed again on every write
+EVICT_TO = 0.95
+
+
+class EmbeddingCache:
+    """Persistent embedding cache backed by SQLite.
+
+    Entries are keyed by (provider, model, sha256(text)) and evicted least
+    recently used first once the cache grows past `max_entries`. Writes track
+    an upper bound of the row count instead of counting the table; only when
+    it passes `max_entries` is the table counted and trimmed. The database
+    runs in WAL mode so several processes (the gRPC service, ingestion
+    scripts) can share one file.
+    """
+
+    def __init__(self, path: str | Path, max_entries: int = 200_000):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_entries = max(1, max_entries)
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS embeddings (
+                provider TEXT NOT NULL,
+                model TEXT NOT NULL,
+                text_hash TEXT NOT NULL,
+                vector BLOB NOT NULL,
+                last_used REAL NOT NULL,
+                PRIMARY KEY (provider, model, text_hash)
+            )"""
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_embeddings_last_used ON embeddings (last_used)")
+        self._conn.commit()
+
+        # upper bound of the row count: replaced rows and other processes' evictions aren't subtracted
+        self._approx_count = len(self)
+        logger.info(f"Embedding cache at {self.path} holds {self._approx_count} entries")
+
+    @staticmethod
+    def _hash(text: str) -> str:
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+
+    def get_many(self, provider: str, model: str, texts: list[str]) -> list[list[float] | None]:
+        """Look up embeddings for `texts`; missing entries come back as None."""
+        if not texts:
+            return []
+
+        hashes = [self._hash(t) for t in texts]
+        found = {}
+        now = time.time()
+
+        with self._lock:
+            unique = list(dict.fromkeys(hashes))
+            # stay well under SQLite's bound-parameter limit
+            for i in range(0, len(unique), 500):
+                chunk = unique[i:i + 500]
+                placeholders = ",".join("?" * len(chunk))
+                rows = self._conn.execute(
+                    f"SELECT text_hash, vector FROM embeddings "
+                    f"WHERE provider = ? AND model = ? AND text_hash IN ({placeholders})",
+                    [provider, model, *chunk],
+                ).fetchall()
+                for text_hash, blob in rows:
+                    found[text_hash] = array("f", blob).tolist()
+
+            if found:
+                self._conn.executemany(
+                    "UPDATE embeddings SET last_used = ? WHERE provider = ? AND model = ? AND text_hash = ?",
+                    [(now, provider, model, h) for h in found],
+                )
+                self._conn.commit()
+
+            results = [found.get(h) for h in hashes]
+            hit_count = sum(1 for r in results if r is not None)
+            self.hits += hit_count
+            self.misses += len(results) - hit_count
+
+        return results
+
+    def put_many(self, provider: str, model: str, texts: list[str], embeddings: list[list[float]]):
+        if not texts:
+            return
+
+        now = time.time()
+        rows = [
+            (provider, model, self._hash(text), array("f", embedding).tobytes(), now)
+            for text, embedding in zip(texts, embeddings)
+        ]
+
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (provider, model, text_hash, vector, last_used) "
+                "VALUES (?, ?, ?, ?, ?)",
+                rows,
+            )
+            self._approx_count += len(rows)
+            if self._approx_count > self.max_entries:
+                self._evict()
+            self._conn.commit()
+
+    def _evict(self):
+        count = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+        if count > self.max_entries:
+            overflow = count - int(self.max_entries * EVICT_TO)
+            self._conn.execute(
+                "DELETE FROM embeddings WHERE rowid IN "
+                "(SELECT rowid FROM embeddings ORDER BY last_used ASC LIMIT ?)",
+                (overflow,),
+            )
+            count -= overflow
+            logger.info(f"Evicted {overflow} embeddings from cache")
+        self._approx_count = count
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -1,48 +1,219 @@
 import grpc
 from concurrent import futures
+import hmac
 import logging
 import os
+import threading
 from pathlib import Path
 
 from app.generated import rag_pb2, rag_pb2_grpc
-from app.course_loader import load_courses_from_json
+from app.course_loader import CourseCatalog
+from app.catalog_snapshot import load_catalog, source_digest
+from app.catalog_watcher import CatalogWatcher
 from app.vector_store import VectorStore
+from app.embedding_cache import EmbeddingCache
+from app.answer_cache import SemanticAnswerCache
 from app.rag_engine import RAGEngine
+from app.warmup import ModelWarmer, parse_days, parse_hours
+from app.context_builder import ContextBuilder
+from app.admission import (
+    AdmissionRejected,
+    AdmissionTimeout,
+    AsyncConcurrencyLimiter,
+    ConcurrencyLimiter,
+    request_scope,
+    split_limit,
+)
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
+def filters_from_proto(filters) -> dict | None:
+    """Translate a SearchFilters message into VectorStore metadata filters."""
+    result = {}
+
+    departments = [d for d in filters.departments if d]
+    if departments:
+        result["department"] = departments
+
+    credits = {}
+    if filters.min_credits:
+        credits["$gte"] = filters.min_credits
+    if filters.max_credits:
+        credits["$lte"] = filters.max_credits
+    if credits:
+        result["credits"] = credits
+
+    codes = [c.upper().replace(" ", "") for c in filters.course_codes if c]
+    if codes:
+        result["code"] = codes
+
+    return result or None
+
+
+def sources_to_proto(sources: list[dict]) -> list[rag_pb2.SourceDocument]:
+    return [
+        rag_pb2.SourceDocument(
+            course_code=source.get("course_code", ""),
+            course_name=source.get("course_name", ""),
+            content=source.get("content", ""),
+            relevance_score=source.get("relevance_score", 0.0),
+        )
+        for source in sources
+    ]
+
+
+def prompt_usage_to_proto(usage: dict | None) -> rag_pb2.PromptUsage | None:
+    if usage is None:
+        return None
+    return rag_pb2.PromptUsage(
+        prompt_tokens=usage.get("prompt_tokens", 0),
+        dropped_tokens=usage.get("dropped_tokens", 0),
+        dropped_sources=usage.get("dropped_sources", 0),
+    )
+
+
+def query_response_from_result(result: dict) -> rag_pb2.QueryResponse:
+    return rag_pb2.QueryResponse(
+        answer=result.get("answer", ""),
+        sources=sources_to_proto(result.get("sources", [])),
+        prompt_usage=prompt_usage_to_proto(result.get("prompt_usage")),
+    )
+
+
+def reject(context, error: AdmissionRejected, response):
+    """Fail the call with a retryable status instead of queueing behind a saturated provider."""
+    logger.warning(f"Rejected request: {error}")
+    if isinstance(error, AdmissionTimeout):
+        context.set_code(grpc.StatusCode.DEADLINE_EXCEEDED)
+    else:
+        context.set_code(grpc.StatusCode.RESOURCE_EXHAUSTED)
+    context.set_details(str(error))
+    return response
+
+
+# metadata key carrying ADMIN_TOKEN for administrative RPCs (ReloadCatalog)
+ADMIN_TOKEN_METADATA = "x-admin-token"
+
+
+def authorize_admin(context, admin_token: str | None, response):
+    """Return None if the call carries `admin_token`, else fail it and return `response`."""
+    if not admin_token:
+        context.set_code(grpc.StatusCode.PERMISSION_DENIED)
+        context.set_details("Administrative RPCs are disabled; set ADMIN_TOKEN to enable them")
+        return response
+    supplied = dict(context.invocation_metadata()).get(ADMIN_TOKEN_METADATA, "")
+    if not hmac.compare_digest(supplied.encode(), admin_token.encode()):
+        logger.warning("Rejected unauthenticated administrative call")
+        context.set_code(grpc.StatusCode.UNAUTHENTICATED)
+        context.set_details(f"Missing or wrong {ADMIN_TOKEN_METADATA} metadata")
+        return response
+    return None
+
+
+def course_summaries_to_proto(courses: list) -> list[rag_pb2.CourseSummary]:
+    return [
+        rag_pb2.CourseSummary(
+            course_code=course.code,
+            course_name=course.name,
+            department=course.department,
+            credits=course.credits,
+            instructors=course.instructors,
+        )
+        for course in courses
+    ]
+
+
+def search_courses_response(catalog: CourseCatalog, request) -> rag_pb2.SearchCoursesResponse:
+    matches = catalog.search(
+        department=request.department,
+        instructor=request.instructor,
+        code_prefix=request.code_prefix,
+    )
+    return rag_pb2.SearchCoursesResponse(
+        courses=course_summaries_to_proto(matches[:request.limit or 50]),
+        total=len(matches),
+    )
+
+
+def autocomplete_response(catalog: CourseCatalog, request) -> rag_pb2.AutocompleteResponse:
+    suggestions = catalog.autocomplete(request.prefix, limit=request.limit or 10)
+    return rag_pb2.AutocompleteResponse(suggestions=course_summaries_to_proto(suggestions))
+
+
+def limiter_metrics_to_proto(stats: dict) -> rag_pb2.LimiterMetrics:
+    return rag_pb2.LimiterMetrics(**stats)
+
+
+def cache_metrics_to_proto(name: str, stats: dict) -> rag_pb2.CacheMetrics:
+    return rag_pb2.CacheMetrics(
+        name=name,
+        size=stats.get("size", stats.get("entries", 0)),
+        hits=stats.get("hits", 0),
+        misses=stats.get("misses", 0),
+        hit_rate=stats.get("hit_rate", 0.0),
+    )
+
+
+def metrics_response(rag_engine: RAGEngine) -> rag_pb2.MetricsResponse:
+    limiters = [
+        rag_engine.chat_limiter,
+        rag_engine.async_chat_limiter,
+        rag_engine.vector_store.embedding_limiter,
+        rag_engine.vector_store.async_embedding_limiter,
+    ]
+    return rag_pb2.MetricsResponse(
+        limiters=[limiter_metrics_to_proto(limiter.stats()) for limiter in limiters if limiter],
+        caches=[
+            cache_metrics_to_proto(name, stats)
+            for name, stats in rag_engine.cache_stats().items() if stats is not None
+        ],
+    )
+
+
 class RAGServicer(rag_pb2_grpc.RAGServiceServicer):
-    def __init__(self, rag_engine: RAGEngine, courses: list):
+    def __init__(
+        self,
+        rag_engine: RAGEngine,
+        courses: list,
+        warmer: ModelWarmer | None = None,
+        catalog_watcher: CatalogWatcher | None = None,
+        admin_token: str | None = None,  # required by ReloadCatalog; None disables it
+    ):
         self.rag_engine = rag_engine
         self.courses = courses
+        self.warmer = warmer
+        self.catalog_watcher = catalog_watcher
+        self.admin_token = admin_token
+
+    def health_status(self) -> str:
+        # "warming" until the models are loaded; callers should wait for "ok"
+        return self.warmer.status if self.warmer else "ok"
 
     def Health(self, request, context):
-        return rag_pb2.HealthResponse(status="ok")
+        return rag_pb2.HealthResponse(status=self.health_status())
 
     def Query(self, request, context):
         question = request.question
         max_results = request.max_results or 5
+        filters = filters_from_proto(request.filters) if request.HasField("filters") else None
+        search_mode = request.search_mode or None
 
-        logger.info(f"Received query: {question}")
+        logger.info(f"Received query: {question} (filters: {filters}, mode: {search_mode or 'default'})")
 
         try:
-            result = self.rag_engine.query(question, max_results=max_results)
-
-            sources = []
-            for source in result.get("sources", []):
-                sources.append(rag_pb2.SourceDocument(
-                    course_code=source.get("course_code", ""),
-                    course_name=source.get("course_name", ""),
-                    content=source.get("content", ""),
-                    relevance_score=source.get("relevance_score", 0.0),
-                ))
+            with request_scope(context.time_remaining()):
+                result = self.rag_engine.query(
+                    question,
+                    max_results=max_results,
+                    filters=filters,
+                    search_mode=search_mode,
+                )
 
-            return rag_pb2.QueryResponse(
-                answer=result.get("answer", ""),
-                sources=sources,
-            )
+            return query_response_from_result(result)
+        except AdmissionRejected as e:
+            return reject(context, e, rag_pb2.QueryResponse())
         except Exception as e:
             logger.error(f"Error processing query: {e}")
             return rag_pb2.QueryResponse(
@@ -50,6 +221,72 @@ class RAGServicer(rag_pb2_grpc.RAGServiceServicer):
                 error_message=str(e),
             )
 
+    def QueryStream(self, request, context):
+        question = request.question
+        max_results = request.max_results or 5
+        filters = filters_from_proto(request.filters) if request.HasField("filters") else None
+        search_mode = request.search_mode or None
+
+        logger.info(f"Received streaming query: {question} (filters: {filters}, mode: {search_mode or 'default'})")
+
+        prompt_usage = None
+        try:
+            with request_scope(context.time_remaining()):
+                for event in self.rag_engine.query_stream(
+                    question,
+                    max_results=max_results,
+                    filters=filters,
+                    search_mode=search_mode,
+                ):
+                    if not context.is_active():
+                        logger.info("Client cancelled streaming query")
+                        return
+                    if "sources" in event:
+                        yield rag_pb2.QueryStreamChunk(sources=sources_to_proto(event["sources"]))
+                    elif "prompt_usage" in event:
+                        prompt_usage = prompt_usage_to_proto(event["prompt_usage"])
+                    elif "delta" in event:
+                        yield rag_pb2.QueryStreamChunk(answer_delta=event["delta"])
+                    elif "error" in event:
+                        yield rag_pb2.QueryStreamChunk(error_message=event["error"], done=True, prompt_usage=prompt_usage)
+                        return
+
+            yield rag_pb2.QueryStreamChunk(done=True, prompt_usage=prompt_usage)
+        except AdmissionRejected as e:
+            reject(context, e, None)
+        except Exception as e:
+            logger.error(f"Error processing streaming query: {e}")
+            yield rag_pb2.QueryStreamChunk(error_message=str(e), done=True)
+
+    def BatchQuery(self, request, context):
+        questions = list(request.questions)
+        max_results = request.max_results or 5
+        filters = filters_from_proto(request.filters) if request.HasField("filters") else None
+        search_mode = request.search_mode or None
+
+        logger.info(f"Received batch query with {len(questions)} questions (sources_only: {request.sources_only})")
+
+        try:
+            with request_scope(context.time_remaining()):
+                results = self.rag_engine.query_many(
+                    questions,
+                    max_results=max_results,
+                    filters=filters,
+                    search_mode=search_mode,
+                    sources_only=request.sources_only,
+                )
+
+            return rag_pb2.BatchQueryResponse(
+                results=[query_response_from_result(result) for result in results],
+            )
+        except AdmissionRejected as e:
+            return reject(context, e, rag_pb2.BatchQueryResponse())
+        except Exception as e:
+            logger.error(f"Error processing batch query: {e}")
+            return rag_pb2.BatchQueryResponse(
+                error_message=str(e),
+            )
+
     def GetCourseInfo(self, request, context):
         course_code = request.course_code
 
@@ -93,23 +330,40 @@ class RAGServicer(rag_pb2_grpc.RAGServiceServicer):
                 error_message=str(e),
             )
 
+    def SearchCourses(self, request, context):
+        try:
+            return search_courses_response(self.rag_engine.catalog, request)
+        except Exception as e:
+            logger.error(f"Error searching courses: {e}")
+            return rag_pb2.SearchCoursesResponse(error_message=str(e))
+
+    def Autocomplete(self, request, context):
+        try:
+            return autocomplete_response(self.rag_engine.catalog, request)
+        except Exception as e:
+            logger.error(f"Error autocompleting {request.prefix!r}: {e}")
+            return rag_pb2.AutocompleteResponse(error_message=str(e))
+
     def Recommend(self, request, context):
         completed_courses = list(request.completed_courses)
         interests = list(request.interests)
         max_credits = request.max_credits or 15
         term = request.term or ""
         level = request.level or "undergrad"
+        defer_explanation = request.defer_explanation
 
         logger.info(f"Recommend request - completed: {completed_courses}, interests: {interests}, max_credits: {max_credits}")
 
         try:
-            result = self.rag_engine.recommend(
-                completed_courses=completed_courses,
-                interests=interests,
-                max_credits=max_credits,
-                term=term,
-                level=level,
-            )
+            with request_scope(context.time_remaining()):
+                result = self.rag_engine.recommend(
+                    completed_courses=completed_courses,
+                    interests=interests,
+                    max_credits=max_credits,
+                    term=term,
+                    level=level,
+                    defer_explanation=defer_explanation,
+                )
 
             courses = []
             for course in result.get("courses", []):
@@ -126,24 +380,130 @@ class RAGServicer(rag_pb2_grpc.RAGServiceServicer):
                 courses=courses,
                 total_credits=result.get("total_credits", 0),
                 explanation=result.get("explanation", ""),
+                explanation_token=result.get("explanation_token", ""),
             )
+        except AdmissionRejected as e:
+            return reject(context, e, rag_pb2.RecommendResponse())
         except Exception as e:
             logger.error(f"Error generating recommendations: {e}")
             return rag_pb2.RecommendResponse(
                 error_message=str(e),
             )
 
+    def GetExplanation(self, request, context):
+        wait = request.wait_ms / 1000
+        remaining = context.time_remaining()
+        if remaining is not None:
+            wait = min(wait, remaining)
 
-def serve(port: int = 50052):
+        try:
+            result = self.rag_engine.get_explanation(request.explanation_token, timeout=wait)
+            return rag_pb2.GetExplanationResponse(
+                ready=result["ready"],
+                explanation=result["explanation"],
+            )
+        except KeyError:
+            return rag_pb2.GetExplanationResponse(
+                error_message="Unknown or expired explanation token",
+            )
+        except Exception as e:
+            logger.error(f"Error fetching explanation: {e}")
+            return rag_pb2.GetExplanationResponse(
+                error_message=str(e),
+            )
+
+    def GetMetrics(self, request, context):
+        return metrics_response(self.rag_engine)
+
+    def ReloadCatalog(self, request, context):
+        denied = authorize_admin(context, self.admin_token, rag_pb2.ReloadCatalogResponse())
+        if denied is not None:
+            return denied
+        if self.catalog_watcher is None:
+            return rag_pb2.ReloadCatalogResponse(error_message="Catalog reloading is not enabled")
+
+        logger.info(f"ReloadCatalog request (force: {request.force}, wait: {request.wait})")
+        future = self.catalog_watcher.reload(force=request.force)
+        if not request.wait:
+            return rag_pb2.ReloadCatalogResponse(status="started")
+
+        remaining = context.time_remaining()
+        try:
+            # gRPC reports "no deadline" as a huge time_remaining
+            result = future.result(timeout=None if remaining is None else min(remaining, threading.TIMEOUT_MAX))
+        except futures.TimeoutError:
+            return rag_pb2.ReloadCatalogResponse(status="started")
+        except Exception as e:
+            return rag_pb2.ReloadCatalogResponse(error_message=str(e))
+
+        return rag_pb2.ReloadCatalogResponse(
+            status="reloaded" if result["reloaded"] else "unchanged",
+            courses=result["courses"],
+            index_version=result["index_version"],
+        )
+
+
+def catalog_paths() -> tuple[str, str | None]:
+    """The course data file and its snapshot path (None: snapshots disabled)."""
+    course_data_path = os.environ.get("COURSE_DATA_PATH", "/app/data/courses.json")
+    # set CATALOG_SNAPSHOT_PATH to an empty string to always parse the JSON
+    catalog_snapshot_path = os.environ.get("CATALOG_SNAPSHOT_PATH", f"{course_data_path}.snapshot")
+    return course_data_path, catalog_snapshot_path or None
+
+
+def build_engine(asynchronous: bool = False) -> tuple[RAGEngine, list, bytes]:
+    """Load the catalog and build the RAG engine from environment configuration.
+
+    Returns the engine, its courses and the digest of the course data they
+    were loaded from, for `build_catalog_watcher`.
+
+    With `asynchronous`, the engine also gets limiters for its awaitable
+    (grpc.aio) code paths, sharing each provider's limits with the thread ones.
+    """
     # Get configuration from environment
     ollama_host = os.environ.get("OLLAMA_HOST", "http://ollama:11434")
     embedding_model = os.environ.get("EMBEDDING_MODEL", "nomic-embed-text")
     chat_model = os.environ.get("CHAT_MODEL", "llama3.2")
-    course_data_path = os.environ.get("COURSE_DATA_PATH", "/app/data/courses.json")
+    course_data_path, catalog_snapshot_path = catalog_paths()
     chroma_path = os.environ.get("CHROMA_PATH", "/app/data/chroma")
-    llm_provider = os.environ.get("LLM_PROVIDER", "ollama")  # "ollama" or "openai"
-    embedding_provider = os.environ.get("EMBEDDING_PROVIDER", "ollama")  # "ollama" or "openai"
+    llm_provider = os.environ.get("LLM_PROVIDER", "ollama")  # "ollama", "openai" or "offline"
+    embedding_provider = os.environ.get("EMBEDDING_PROVIDER", "ollama")  # "ollama", "openai" or "offline"
     openai_api_key = os.environ.get("OPENAI_API_KEY")
+    embedding_batch_size = int(os.environ.get("EMBEDDING_BATCH_SIZE", "50"))
+    embedding_concurrency = int(os.environ.get("EMBEDDING_CONCURRENCY", "4"))
+    embedding_max_retries = int(os.environ.get("EMBEDDING_MAX_RETRIES", "3"))
+    # set EMBEDDING_CACHE_PATH to an empty string to disable the on-disk cache
+    embedding_cache_path = os.environ.get("EMBEDDING_CACHE_PATH", os.path.join(chroma_path, "embedding_cache.sqlite3"))
+    embedding_cache_size = int(os.environ.get("EMBEDDING_CACHE_SIZE", "200000"))
+    query_cache_size = int(os.environ.get("QUERY_CACHE_SIZE", "1024"))
+    query_cache_ttl = float(os.environ.get("QUERY_CACHE_TTL_SECONDS", "3600"))
+    vector_backend = os.environ.get("VECTOR_BACKEND", "chroma")  # "chroma" or "numpy"
+    search_mode = os.environ.get("SEARCH_MODE", "vector")  # "vector", "lexical" or "hybrid"
+    vector_quantization = os.environ.get("VECTOR_QUANTIZATION", "none")  # "none", "float16" or "int8"
+    index_keep_versions = int(os.environ.get("INDEX_KEEP_VERSIONS", "1"))
+    batch_generation_concurrency = int(os.environ.get("BATCH_GENERATION_CONCURRENCY", "4"))
+    offline_chat_latency_ms = float(os.environ.get("OFFLINE_CHAT_LATENCY_MS", "0"))
+    answer_cache_size = int(os.environ.get("ANSWER_CACHE_SIZE", "512"))  # 0 disables the answer cache
+    answer_cache_threshold = float(os.environ.get("ANSWER_CACHE_THRESHOLD", "0.95"))
+    answer_cache_ttl = float(os.environ.get("ANSWER_CACHE_TTL_SECONDS", "3600"))
+    explanation_concurrency = int(os.environ.get("EXPLANATION_CONCURRENCY", "2"))
+    explanation_cache_size = int(os.environ.get("EXPLANATION_CACHE_SIZE", "256"))
+    explanation_cache_ttl = float(os.environ.get("EXPLANATION_CACHE_TTL_SECONDS", "3600"))
+    context_token_budget = int(os.environ.get("CONTEXT_TOKEN_BUDGET", "1500"))  # 0 disables the budget
+    context_min_relevance = float(os.environ.get("CONTEXT_MIN_RELEVANCE", "0"))
+    llm_max_concurrency = int(os.environ.get("LLM_MAX_CONCURRENCY", "2"))
+    llm_max_queue = int(os.environ.get("LLM_MAX_QUEUE", "4"))
+    embedding_max_concurrency = int(os.environ.get("EMBEDDING_MAX_CONCURRENCY", "4"))
+    embedding_max_queue = int(os.environ.get("EMBEDDING_MAX_QUEUE", "8"))
+    llm_threads, llm_async = split_limit("LLM_MAX_CONCURRENCY", llm_max_concurrency, asynchronous, minimum=1)
+    llm_queue_threads, llm_queue_async = split_limit("LLM_MAX_QUEUE", llm_max_queue, asynchronous)
+    embedding_threads, embedding_async = split_limit(
+        "EMBEDDING_MAX_CONCURRENCY", embedding_max_concurrency, asynchronous, minimum=1
+    )
+    embedding_queue_threads, embedding_queue_async = split_limit(
+        "EMBEDDING_MAX_QUEUE", embedding_max_queue, asynchronous
+    )
+    ollama_keep_alive = os.environ.get("OLLAMA_KEEP_ALIVE", "30m") or None
 
     logger.info(f"LLM provider: {llm_provider}")
     logger.info(f"Embedding provider: {embedding_provider}")
@@ -151,6 +511,8 @@ def serve(port: int = 50052):
     logger.info(f"Embedding model: {embedding_model}")
     logger.info(f"Chat model: {chat_model}")
     logger.info(f"Course data path: {course_data_path}")
+    logger.info(f"Vector backend: {vector_backend} (quantization: {vector_quantization})")
+    logger.info(f"Search mode: {search_mode}")
 
     # Load course data
     course_file = Path(course_data_path)
@@ -159,9 +521,15 @@ def serve(port: int = 50052):
         raise FileNotFoundError(f"Course data file not found: {course_data_path}")
 
     logger.info("Loading course data...")
-    courses = load_courses_from_json(course_file)
+    # hashed before loading: a change made meanwhile shows up as a change to the watcher
+    catalog_digest = source_digest(course_file)
+    courses, course_indexes = load_catalog(course_file, catalog_snapshot_path, catalog_digest)
     logger.info(f"Loaded {len(courses)} courses")
 
+    embedding_cache = None
+    if embedding_cache_path:
+        embedding_cache = EmbeddingCache(embedding_cache_path, max_entries=embedding_cache_size)
+
     # Initialize vector store
     logger.info("Initializing vector store...")
     vector_store = VectorStore(
@@ -170,12 +538,41 @@ def serve(port: int = 50052):
         persist_directory=chroma_path,
         embedding_provider=embedding_provider,
         openai_api_key=openai_api_key,
+        embedding_batch_size=embedding_batch_size,
+        embedding_concurrency=embedding_concurrency,
+        embedding_max_retries=embedding_max_retries,
+        embedding_cache=embedding_cache,
+        query_cache_size=query_cache_size,
+        query_cache_ttl=query_cache_ttl,
+        index_backend=vector_backend,
+        search_mode=search_mode,
+        quantization=vector_quantization,
+        keep_versions=index_keep_versions,
+        embedding_limiter=ConcurrencyLimiter(
+            f"embedding:{embedding_provider}",
+            max_concurrency=embedding_threads,
+            max_queue=embedding_queue_threads,
+        ),
+        async_embedding_limiter=AsyncConcurrencyLimiter(
+            f"embedding:{embedding_provider}:async",
+            max_concurrency=embedding_async,
+            max_queue=embedding_queue_async,
+        ) if asynchronous else None,
+        ollama_keep_alive=ollama_keep_alive,
     )
 
     # Add courses to vector store
     logger.info("Ingesting courses into vector store...")
     vector_store.add_courses(courses)
 
+    answer_cache = None
+    if answer_cache_size > 0:
+        answer_cache = SemanticAnswerCache(
+            threshold=answer_cache_threshold,
+            max_size=answer_cache_size,
+            ttl_seconds=answer_cache_ttl,
+        )
+
     # Initialize RAG engine
     rag_engine = RAGEngine(
         vector_store=vector_store,
@@ -184,16 +581,77 @@ def serve(port: int = 50052):
         chat_model=chat_model,
         llm_provider=llm_provider,
         openai_api_key=openai_api_key,
+        batch_generation_concurrency=batch_generation_concurrency,
+        offline_latency=offline_chat_latency_ms / 1000,
+        answer_cache=answer_cache,
+        explanation_concurrency=explanation_concurrency,
+        explanation_cache_size=explanation_cache_size,
+        explanation_cache_ttl=explanation_cache_ttl,
+        context_builder=ContextBuilder(
+            token_budget=context_token_budget,
+            min_relevance=context_min_relevance,
+        ),
+        chat_limiter=ConcurrencyLimiter(
+            f"chat:{llm_provider}",
+            max_concurrency=llm_threads,
+            max_queue=llm_queue_threads,
+        ),
+        async_chat_limiter=AsyncConcurrencyLimiter(
+            f"chat:{llm_provider}:async",
+            max_concurrency=llm_async,
+            max_queue=llm_queue_async,
+        ) if asynchronous else None,
+        ollama_keep_alive=ollama_keep_alive,
+        course_indexes=course_indexes,
     )
+    return rag_engine, courses, catalog_digest
+
+
+def build_warmer(rag_engine: RAGEngine) -> ModelWarmer:
+    return ModelWarmer(
+        rag_engine,
+        warmup_queries=int(os.environ.get("WARMUP_QUERIES", "2")),
+        ping_interval=float(os.environ.get("KEEPALIVE_PING_SECONDS", "240")),
+        active_hours=parse_hours(os.environ.get("KEEPALIVE_HOURS", "8-20")),
+        active_days=parse_days(os.environ.get("KEEPALIVE_DAYS", "mon-fri")),
+        timezone=os.environ.get("KEEPALIVE_TIMEZONE", "America/New_York"),
+    )
+
+
+def build_catalog_watcher(rag_engine: RAGEngine, catalog_digest: bytes) -> CatalogWatcher:
+    course_data_path, catalog_snapshot_path = catalog_paths()
+    return CatalogWatcher(
+        rag_engine,
+        Path(course_data_path),
+        catalog_snapshot_path,
+        poll_interval=float(os.environ.get("CATALOG_POLL_SECONDS", "30")),  # 0 disables watching
+        digest=catalog_digest,
+    )
+
+
+def serve(port: int = 50052):
+    grpc_max_workers = int(os.environ.get("GRPC_MAX_WORKERS", "10"))
+    grpc_max_concurrent_rpcs = int(os.environ.get("GRPC_MAX_CONCURRENT_RPCS", "0"))  # 0 means unlimited
+    admin_token = os.environ.get("ADMIN_TOKEN") or None  # unset disables ReloadCatalog
+
+    rag_engine, courses, catalog_digest = build_engine()
+    warmer = build_warmer(rag_engine)
+    catalog_watcher = build_catalog_watcher(rag_engine, catalog_digest)
 
     # Start gRPC server
-    server = grpc.server(futures.ThreadPoolExecutor(max_workers=10))
+    server = grpc.server(
+        futures.ThreadPoolExecutor(max_workers=grpc_max_workers),
+        maximum_concurrent_rpcs=grpc_max_concurrent_rpcs or None,
+    )
     rag_pb2_grpc.add_RAGServiceServicer_to_server(
-        RAGServicer(rag_engine, courses), server
+        RAGServicer(rag_engine, courses, warmer, catalog_watcher, admin_token), server
     )
     server.add_insecure_port(f"[::]:{port}")
     server.start()
     logger.info(f"RAG gRPC server started on port {port}")
+    # Health reports "warming" until the models are loaded
+    warmer.start()
+    catalog_watcher.start()
     server.wait_for_termination()
 
 
@@ -0,0 +1,493 @@
+import json
+import logging
+import os
+import shutil
+import threading
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import NamedTuple
+
+import chromadb
+from chromadb.config import Settings
+import numpy as np
+
+from app.course_loader import lookup_key
+
+logger = logging.getLogger(__name__)
+
+# Metadata filters use a small subset of Chroma's `where` syntax that every
+# backend understands: {"field": value} for equality, {"field": [values]} for
+# membership, or {"field": {"$gte": 3, "$lte": 4}} with the operators below.
+FILTER_OPERATORS = {
+    "$eq": lambda a, b: a == b,
+    "$ne": lambda a, b: a != b,
+    "$gt": lambda a, b: a is not None and a > b,
+    "$gte": lambda a, b: a is not None and a >= b,
+    "$lt": lambda a, b: a is not None and a < b,
+    "$lte": lambda a, b: a is not None and a <= b,
+    "$in": lambda a, b: a in b,
+    "$nin": lambda a, b: a not in b,
+}
+
+
+# metadata fields stored normalized (see vector_store.course_metadata); filter
+# values for them are normalized the same way
+NORMALIZED_FIELDS = {"department": lookup_key}
+
+
+def _normalize_value(field: str, value):
+    normalize = NORMALIZED_FIELDS.get(field)
+    if normalize is None:
+        return value
+    if isinstance(value, (list, tuple, set)):
+        return [normalize(v) if isinstance(v, str) else v for v in value]
+    return normalize(value) if isinstance(value, str) else value
+
+
+def filter_conditions(filters: dict | None) -> list[tuple[str, str, object]]:
+    """Flatten a filter dict into (field, operator, value) conditions."""
+    conditions = []
+    for field, spec in (filters or {}).items():
+        if isinstance(spec, dict):
+            for op, value in spec.items():
+                if op not in FILTER_OPERATORS:
+                    raise ValueError(f"Unsupported filter operator: {op}")
+                conditions.append((field, op, list(value) if op in ("$in", "$nin") else value))
+        elif isinstance(spec, (list, tuple, set)):
+            conditions.append((field, "$in", list(spec)))
+        else:
+            conditions.append((field, "$eq", spec))
+    return [(field, op, _normalize_value(field, value)) for field, op, value in conditions]
+
+
+def matches_filters(metadata: dict, conditions: list[tuple[str, str, object]]) -> bool:
+    return all(FILTER_OPERATORS[op](metadata.get(field), value) for field, op, value in conditions)
+
+
+def to_chroma_where(filters: dict | None) -> dict | None:
+    conditions = filter_conditions(filters)
+    clauses = [{field: {op: value}} for field, op, value in conditions]
+    if not clauses:
+        return None
+    if len(clauses) == 1:
+        return clauses[0]
+    return {"$and": clauses}
+
+
+class IndexBackend(ABC):
+    """Storage and nearest-neighbour search for embedded course documents.
+
+    Every backend ranks by cosine similarity and returns hits as dicts with
+    `id`, `document`, `metadata` and `score` (higher is more similar).
+    """
+
+    name: str
+
+    @abstractmethod
+    def count(self) -> int:
+        ...
+
+    @abstractmethod
+    def get_metadatas(self) -> dict[str, dict]:
+        """Return the metadata of every stored document, keyed by id."""
+
+    @abstractmethod
+    def get_embeddings(self, ids: list[str]) -> dict[str, list[float]]:
+        """Return the stored embeddings of `ids` (missing ids are omitted)."""
+
+    @abstractmethod
+    def upsert(self, ids: list[str], embeddings: list[list[float]], documents: list[str], metadatas: list[dict]):
+        ...
+
+    @abstractmethod
+    def delete(self, ids: list[str]):
+        ...
+
+    @abstractmethod
+    def query(self, embeddings: list[list[float]], n_results: int, filters: dict | None = None) -> list[list[dict]]:
+        """Return the top `n_results` hits matching `filters` for each query embedding."""
+
+    @abstractmethod
+    def reset(self):
+        """Remove every document."""
+
+    @abstractmethod
+    def drop(self):
+        """Delete the index and its storage entirely."""
+
+
+class ChromaBackend(IndexBackend):
+    """Embedded ChromaDB collection using an HNSW index."""
+
+    def __init__(self, persist_directory: str, collection_name: str):
+        self.name = collection_name
+        self.collection_name = collection_name
+        self.client = self.open_client(persist_directory)
+        self.collection = self._get_collection()
+
+    @staticmethod
+    def open_client(persist_directory: str):
+        return chromadb.Client(Settings(
+            persist_directory=persist_directory,
+            anonymized_telemetry=False,
+            is_persistent=True,
+        ))
+
+    @classmethod
+    def list_names(cls, persist_directory: str) -> list[str]:
+        # older chromadb releases return names, newer ones Collection objects
+        return [
+            c if isinstance(c, str) else c.name
+            for c in cls.open_client(persist_directory).list_collections()
+        ]
+
+    def _get_collection(self):
+        return self.client.get_or_create_collection(
+            name=self.collection_name,
+            metadata={"hnsw:space": "cosine"}
+        )
+
+    def count(self) -> int:
+        return self.collection.count()
+
+    def get_metadatas(self) -> dict[str, dict]:
+        existing = self.collection.get(include=["metadatas"])
+        return {
+            doc_id: metadata or {}
+            for doc_id, metadata in zip(existing["ids"], existing["metadatas"] or [])
+        }
+
+    def get_embeddings(self, ids):
+        if not ids:
+            return {}
+        existing = self.collection.get(ids=ids, include=["embeddings"])
+        embeddings = existing["embeddings"]
+        if embeddings is None:
+            return {}
+        return {doc_id: list(embedding) for doc_id, embedding in zip(existing["ids"], embeddings)}
+
+    def upsert(self, ids, embeddings, documents, metadatas):
+        # Chroma rejects writes larger than its max batch size
+        get_max_batch_size = getattr(self.client, "get_max_batch_size", None)
+        batch_size = get_max_batch_size() if get_max_batch_size else 1000
+        for i in range(0, len(ids), batch_size):
+            self.collection.upsert(
+                ids=ids[i:i + batch_size],
+                embeddings=embeddings[i:i + batch_size],
+                documents=documents[i:i + batch_size],
+                metadatas=metadatas[i:i + batch_size],
+            )
+
+    def delete(self, ids):
+        if ids:
+            self.collection.delete(ids=ids)
+
+    def query(self, embeddings, n_results, filters=None):
+        results = self.collection.query(
+            query_embeddings=embeddings,
+            n_results=n_results,
+            where=to_chroma_where(filters),
+            include=["documents", "metadatas", "distances"]
+        )
+
+        hits = []
+        for q in range(len(embeddings)):
+            query_hits = []
+            if results and results["documents"]:
+                for i, doc in enumerate(results["documents"][q]):
+                    metadata = results["metadatas"][q][i] if results["metadatas"] else {}
+                    distance = results["distances"][q][i] if results["distances"] else 0
+
+                    # cosine distance -> similarity score
+                    query_hits.append({
+                        "id": results["ids"][q][i],
+                        "document": doc,
+                        "metadata": metadata or {},
+                        "score": 1 - distance,
+                    })
+            hits.append(query_hits)
+        return hits
+
+    def reset(self):
+        self.client.delete_collection(self.collection_name)
+        self.collection = self._get_collection()
+
+    def drop(self):
+        self.client.delete_collection(self.collection_name)
+
+
+class _NumpyState(NamedTuple):
+    matrix: np.ndarray  # float32, L2-normalized, memory-mapped
+    ids: list[str]
+    documents: list[str]
+    metadatas: list[dict]
+    compact: np.ndarray | None  # quantized copy used for the first pass, if enabled
+    scales: np.ndarray | None  # per-row int8 scale factors
+
+
+class NumpyBackend(IndexBackend):
+    """Exact cosine search over a memory-mapped float32 matrix.
+
+    Embeddings are L2-normalized and stored row-per-document in
+    `<directory>/<name>/embeddings.npy`; ids, documents and metadata live in a
+    JSON sidecar. A query is one matrix-vector product plus `argpartition`,
+    which beats HNSW for catalogs of a few thousand documents.
+
+    With `quantization` set to "float16" or "int8" (per-row scale), only the
+    compact copy is held in memory and scanned; the top `n_results *
+    rescore_factor` candidates are then rescored exactly against the
+    memory-mapped float32 rows.
+    """
+
+    QUANTIZATIONS = ("none", "float16", "int8")
+    # rows scored per block, bounding the float32 temporaries of quantized scans
+    BLOCK_ROWS = 8192
+
+    def __init__(self, directory: str, name: str, quantization: str = "none", rescore_factor: int = 4):
+        quantization = quantization.lower()
+        if quantization not in self.QUANTIZATIONS:
+            raise ValueError(f"Unknown quantization: {quantization} (expected one of {', '.join(self.QUANTIZATIONS)})")
+
+        self.quantization = quantization
+        self.rescore_factor = max(1, rescore_factor)
+        self.name = name
+        self.path = Path(directory) / name
+        self.path.mkdir(parents=True, exist_ok=True)
+        self._matrix_file = self.path / "embeddings.npy"
+        self._records_file = self.path / "records.json"
+        self._write_lock = threading.Lock()
+        # swapped as one tuple so readers always see a consistent snapshot
+        self._state = self._load()
+
+    def _quantize(self, matrix: np.ndarray) -> tuple[np.ndarray | None, np.ndarray | None]:
+        if self.quantization == "float16":
+            return np.asarray(matrix, dtype=np.float16), None
+        if self.quantization == "int8":
+            scales = np.abs(matrix).max(axis=1).astype(np.float32) / 127.0
+            scales[scales == 0] = 1.0
+            compact = np.rint(matrix / scales[:, None]).astype(np.int8)
+            return compact, scales
+        return None, None
+
+    def _load(self) -> _NumpyState:
+        if not self._matrix_file.exists() or not self._records_file.exists():
+            return _NumpyState(np.zeros((0, 0), dtype=np.float32), [], [], [], None, None)
+
+        with open(self._records_file, "r", encoding="utf-8") as f:
+            records = json.load(f)
+        matrix = np.load(self._matrix_file, mmap_mode="r")
+        compact, scales = self._quantize(matrix)
+        return _NumpyState(matrix, records["ids"], records["documents"], records["metadatas"], compact, scales)
+
+    def _save(self, matrix: np.ndarray, ids: list[str], documents: list[str], metadatas: list[dict]):
+        # write to temp files then rename, so a crash never leaves a torn index
+        tmp_matrix = self.path / "embeddings.tmp.npy"
+        tmp_records = self.path / "records.tmp.json"
+        np.save(tmp_matrix, np.ascontiguousarray(matrix, dtype=np.float32))
+        with open(tmp_records, "w", encoding="utf-8") as f:
+            json.dump({"ids": ids, "documents": documents, "metadatas": metadatas}, f)
+        os.replace(tmp_matrix, self._matrix_file)
+        os.replace(tmp_records, self._records_file)
+
+        self._state = self._load()
+
+    @staticmethod
+    def _normalize(vectors: np.ndarray) -> np.ndarray:
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return vectors / norms
+
+    def count(self) -> int:
+        return len(self._state.ids)
+
+    def memory_usage(self) -> dict:
+        """Bytes held in memory for scanning vs. the full float32 matrix on disk."""
+        state = self._state
+        float32_bytes = int(state.matrix.size) * 4
+        if state.compact is None:
+            resident = float32_bytes
+        else:
+            resident = int(state.compact.nbytes) + (int(state.scales.nbytes) if state.scales is not None else 0)
+        return {
+            "quantization": self.quantization,
+            "documents": len(state.ids),
+            "dimensions": int(state.matrix.shape[1]) if state.matrix.ndim == 2 else 0,
+            "scan_bytes": resident,
+            "float32_bytes": float32_bytes,
+        }
+
+    @classmethod
+    def list_names(cls, directory: str) -> list[str]:
+        root = Path(directory)
+        if not root.is_dir():
+            return []
+        return [p.name for p in root.iterdir() if (p / "records.json").exists() or (p / "embeddings.npy").exists()]
+
+    def get_metadatas(self) -> dict[str, dict]:
+        state = self._state
+        return dict(zip(state.ids, state.metadatas))
+
+    def get_embeddings(self, ids):
+        state = self._state
+        positions = {doc_id: i for i, doc_id in enumerate(state.ids)}
+        return {doc_id: state.matrix[positions[doc_id]].tolist() for doc_id in ids if doc_id in positions}
+
+    def upsert(self, ids, embeddings, documents, metadatas):
+        if not ids:
+            return
+
+        new_vectors = self._normalize(np.asarray(embeddings, dtype=np.float32))
+
+        with self._write_lock:
+            state = self._state
+            matrix = np.array(state.matrix, dtype=np.float32) if state.ids else np.zeros((0, new_vectors.shape[1]), dtype=np.float32)
+            all_ids = list(state.ids)
+            all_documents = list(state.documents)
+            all_metadatas = list(state.metadatas)
+            positions = {doc_id: i for i, doc_id in enumerate(all_ids)}
+
+            appended = []
+            for row, doc_id in enumerate(ids):
+                if doc_id in positions:
+                    i = positions[doc_id]
+                    matrix[i] = new_vectors[row]
+                    all_documents[i] = documents[row]
+                    all_metadatas[i] = metadatas[row]
+                else:
+                    positions[doc_id] = len(all_ids)
+                    all_ids.append(doc_id)
+                    all_documents.append(documents[row])
+                    all_metadatas.append(metadatas[row])
+                    appended.append(row)
+
+            if appended:
+                matrix = np.vstack([matrix, new_vectors[appended]])
+
+            self._save(matrix, all_ids, all_documents, all_metadatas)
+
+    def delete(self, ids):
+        if not ids:
+            return
+
+        with self._write_lock:
+            state = self._state
+            removed = set(ids)
+            keep = [i for i, doc_id in enumerate(state.ids) if doc_id not in removed]
+            self._save(
+                np.asarray(state.matrix)[keep],
+                [state.ids[i] for i in keep],
+                [state.documents[i] for i in keep],
+                [state.metadatas[i] for i in keep],
+            )
+
+    def _scan(self, state: _NumpyState, rows: np.ndarray | None, queries: np.ndarray) -> np.ndarray:
+        """Approximate (n_rows, n_queries) scores from the quantized copy, block by block."""
+        compact = state.compact if rows is None else state.compact[rows]
+        scales = state.scales if rows is None or state.scales is None else state.scales[rows]
+
+        scores = np.empty((compact.shape[0], queries.shape[0]), dtype=np.float32)
+        for start in range(0, compact.shape[0], self.BLOCK_ROWS):
+            block = compact[start:start + self.BLOCK_ROWS].astype(np.float32)
+            block_scores = block @ queries.T
+            if scales is not None:
+                block_scores *= scales[start:start + self.BLOCK_ROWS, None]
+            scores[start:start + self.BLOCK_ROWS] = block_scores
+        return scores
+
+    def query(self, embeddings, n_results, filters=None):
+        state = self._state
+        if not state.ids or n_results <= 0:
+            return [[] for _ in embeddings]
+
+        # Filter first, then rank only the rows that can be returned
+        candidates = None
+        conditions = filter_conditions(filters)
+        if conditions:
+            candidates = np.fromiter(
+                (i for i, metadata in enumerate(state.metadatas) if matches_filters(metadata, conditions)),
+                dtype=np.intp,
+            )
+            if candidates.size == 0:
+                return [[] for _ in embeddings]
+
+        queries = self._normalize(np.asarray(embeddings, dtype=np.float32))
+        if state.compact is None:
+            matrix = state.matrix if candidates is None else state.matrix[candidates]
+            # (n_docs, n_queries) similarity matrix in one BLAS call
+            scores = matrix @ queries.T
+        else:
+            scores = self._scan(state, candidates, queries)
+
+        n_rows = scores.shape[0]
+        k = min(n_results, n_rows)
+        # quantized scores only pick a shortlist; exact float32 scores decide the order
+        shortlist = k if state.compact is None else min(k * self.rescore_factor, n_rows)
+
+        hits = []
+        for q in range(queries.shape[0]):
+            column = scores[:, q]
+            if shortlist < n_rows:
+                top = np.argpartition(-column, shortlist - 1)[:shortlist]
+            else:
+                top = np.arange(n_rows)
+            rows = top if candidates is None else candidates[top]
+
+            if state.compact is not None:
+                # sorted rows keep the reads from the memory-mapped matrix sequential
+                rows = np.sort(rows)
+                exact = np.asarray(state.matrix[rows]) @ queries[q]
+                order = np.argsort(-exact)[:k]
+                rows = rows[order]
+                row_scores = exact[order]
+            else:
+                order = np.argsort(-column[top])
+                rows = rows[order]
+                row_scores = column[top][order]
+
+            hits.append([
+                {
+                    "id": state.ids[row],
+                    "document": state.documents[row],
+                    "metadata": state.metadatas[row],
+                    "score": float(score),
+                }
+                for row, score in zip(rows, row_scores)
+            ])
+        return hits
+
+    def reset(self):
+        with self._write_lock:
+            for f in (self._matrix_file, self._records_file):
+                if f.exists():
+                    f.unlink()
+            self._state = self._load()
+
+    def drop(self):
+        with self._write_lock:
+            # readers holding the old state keep their memory map open until done
+            shutil.rmtree(self.path, ignore_errors=True)
+
+
+BACKENDS = {
+    "chroma": ChromaBackend,
+    "numpy": NumpyBackend,
+}
+
+
+def list_backend_names(kind: str, persist_directory: str) -> list[str]:
+    """Names of every index of this backend kind stored under `persist_directory`."""
+    backend = BACKENDS.get(kind.lower())
+    if backend is None:
+        raise ValueError(f"Unknown vector backend: {kind} (expected 'chroma' or 'numpy')")
+    return backend.list_names(persist_directory)
+
+
+def create_backend(kind: str, persist_directory: str, name: str, quantization: str = "none") -> IndexBackend:
+    kind = kind.lower()
+    if kind == "chroma":
+        if quantization.lower() != "none":
+            raise ValueError("Quantized storage is only supported by the numpy vector backend")
+        return ChromaBackend(persist_directory, name)
+    if kind == "numpy":
+        return NumpyBackend(persist_directory, name, quantization=quantization)
+    raise ValueError(f"Unknown vector backend: {kind} (expected 'chroma' or 'numpy')")
@@ -0,0 +1,132 @@
+import math
+import re
+from collections import Counter, defaultdict
+
+import numpy as np
+
+from app.course_loader import COURSE_CODE_RE
+from app.index_backends import filter_conditions, matches_filters
+
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+STOPWORDS = frozenset("""
+a an and are as at be by can do does for from how i in is it me my of on or
+should take than that the this to what when which who will with you
+""".split())
+
+
+def tokenize(text: str, code_prefixes: frozenset[str] = frozenset()) -> list[str]:
+    """Lowercase terms of `text`, without stopwords.
+
+    "COP 3530" and "COP3530" produce the same token when "cop" is one of
+    `code_prefixes`; other words stay apart from a following number, so
+    "the 3000 level" keeps "3000" as a term.
+    """
+    if code_prefixes:
+        text = COURSE_CODE_RE.sub(
+            lambda m: m[1] + m[2] if m[1].lower() in code_prefixes else m[0],
+            text,
+        )
+    return [t for t in TOKEN_RE.findall(text.lower()) if t not in STOPWORDS]
+
+
+def code_prefixes(ids: list[str]) -> frozenset[str]:
+    """Lowercase department prefixes of the course codes in `ids`."""
+    return frozenset(m[1].lower() for code in ids if (m := COURSE_CODE_RE.match(code)))
+
+
+class BM25Index:
+    """In-memory BM25 inverted index over course documents.
+
+    Postings hold the final per-document BM25 weight of each term (idf and
+    length normalization folded in at build time), so a query is just a few
+    vectorized adds over the postings of its terms.
+    """
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.ids: list[str] = []
+        self.documents: list[str] = []
+        self.metadatas: list[dict] = []
+        self.postings: dict[str, tuple[np.ndarray, np.ndarray]] = {}
+        self.code_prefixes: frozenset[str] = frozenset()
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def build(self, ids: list[str], documents: list[str], metadatas: list[dict]):
+        prefixes = code_prefixes(ids)
+        term_freqs = [Counter(tokenize(doc, prefixes)) for doc in documents]
+        lengths = np.array([sum(tf.values()) for tf in term_freqs], dtype=np.float32)
+        avg_length = float(lengths.mean()) if len(lengths) else 0.0
+
+        raw = defaultdict(list)
+        for doc_idx, tf in enumerate(term_freqs):
+            for term, freq in tf.items():
+                raw[term].append((doc_idx, freq))
+
+        n_docs = len(documents)
+        postings = {}
+        for term, entries in raw.items():
+            doc_indices = np.array([d for d, _ in entries], dtype=np.intp)
+            freqs = np.array([f for _, f in entries], dtype=np.float32)
+            idf = math.log(1 + (n_docs - len(entries) + 0.5) / (len(entries) + 0.5))
+            norm = self.k1 * (1 - self.b + self.b * lengths[doc_indices] / (avg_length or 1.0))
+            weights = idf * freqs * (self.k1 + 1) / (freqs + norm)
+            postings[term] = (doc_indices, weights.astype(np.float32))
+
+        # swap everything in together so concurrent searches see one version
+        self.ids, self.documents, self.metadatas, self.postings, self.code_prefixes = (
+            list(ids), list(documents), list(metadatas), postings, prefixes
+        )
+
+    def search(self, query: str, n_results: int = 5, filters: dict | None = None) -> list[dict]:
+        ids, documents, metadatas, postings = self.ids, self.documents, self.metadatas, self.postings
+        terms = [t for t in set(tokenize(query, self.code_prefixes)) if t in postings]
+        if not terms or n_results <= 0:
+            return []
+
+        scores = np.zeros(len(ids), dtype=np.float32)
+        for term in terms:
+            doc_indices, weights = postings[term]
+            scores[doc_indices] += weights
+
+        candidates = np.flatnonzero(scores)
+        conditions = filter_conditions(filters)
+        if conditions:
+            candidates = np.array(
+                [i for i in candidates if matches_filters(metadatas[i], conditions)],
+                dtype=np.intp,
+            )
+        if candidates.size == 0:
+            return []
+
+        k = min(n_results, candidates.size)
+        candidate_scores = scores[candidates]
+        top = np.argpartition(-candidate_scores, k - 1)[:k]
+        top = top[np.argsort(-candidate_scores[top])]
+
+        return [
+            {
+                "id": ids[candidates[i]],
+                "document": documents[candidates[i]],
+                "metadata": metadatas[candidates[i]],
+                "score": float(candidate_scores[i]),
+            }
+            for i in top
+        ]
+
+
+def reciprocal_rank_fusion(result_lists: list[list[dict]], k: int = 60) -> list[tuple[dict, float]]:
+    """Fuse ranked hit lists by id; returns (hit, score) with score scaled to [0, 1]."""
+    fused: dict[str, float] = {}
+    first_seen: dict[str, dict] = {}
+    for hits in result_lists:
+        for rank, hit in enumerate(hits, 1):
+            fused[hit["id"]] = fused.get(hit["id"], 0.0) + 1.0 / (k + rank)
+            first_seen.setdefault(hit["id"], hit)
+
+    best_possible = len(result_lists) / (k + 1)
+    ranked = sorted(fused.items(), key=lambda item: item[1], reverse=True)
+    return [(first_seen[doc_id], score / best_possible) for doc_id, score in ranked]
@@ -0,0 +1,91 @@
+"""Deterministic, network-free embedding and chat providers.
+
+Selected with EMBEDDING_PROVIDER=offline / LLM_PROVIDER=offline so the
+retrieval and gRPC stack can be benchmarked or tested without a model server.
+"""
+
+import asyncio
+import functools
+import hashlib
+import re
+import time
+from collections.abc import AsyncIterator, Iterator
+
+import numpy as np
+
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+COURSE_HEADER_RE = re.compile(r"^Course: (.+)$", re.MULTILINE)
+
+
+class HashingEmbedder:
+    """Feature-hashing bag-of-words embedder (unigrams + bigrams, signed buckets)."""
+
+    def __init__(self, dim: int = 384, bucket_cache_size: int = 1 << 16):
+        self.dim = dim
+        # bounded: every distinct query adds features, so an unbounded memo grows
+        # for the life of the server
+        self._bucket = functools.lru_cache(maxsize=bucket_cache_size)(self._hash_feature)
+
+    def _hash_feature(self, feature: str) -> tuple[int, float]:
+        digest = hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest()
+        value = int.from_bytes(digest, "little")
+        return value % self.dim, 1.0 if value >> 63 else -1.0
+
+    def embed(self, texts: list[str]) -> list[list[float]]:
+        rows, cols, signs = [], [], []
+        for row, text in enumerate(texts):
+            tokens = TOKEN_RE.findall(text.lower())
+            features = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+            for feature in features:
+                col, sign = self._bucket(feature)
+                rows.append(row)
+                cols.append(col)
+                signs.append(sign)
+
+        matrix = np.zeros((len(texts), self.dim), dtype=np.float32)
+        np.add.at(matrix, (np.asarray(rows, dtype=np.intp), np.asarray(cols, dtype=np.intp)), signs)
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return (matrix / norms).tolist()
+
+
+class EchoChat:
+    """Chat stand-in that templates the prompt instead of calling a model.
+
+    `latency` seconds are slept per call to imitate model time-to-answer.
+    """
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+
+    def chat(self, system_prompt: str, user_prompt: str) -> str:
+        if self.latency > 0:
+            time.sleep(self.latency)
+        return self._template(user_prompt)
+
+    def stream(self, system_prompt: str, user_prompt: str) -> Iterator[str]:
+        # the latency is paid before the first token, like a model's prefill
+        if self.latency > 0:
+            time.sleep(self.latency)
+        for i, word in enumerate(self._template(user_prompt).split(" ")):
+            yield word if i == 0 else " " + word
+
+    async def achat(self, system_prompt: str, user_prompt: str) -> str:
+        if self.latency > 0:
+            await asyncio.sleep(self.latency)
+        return self._template(user_prompt)
+
+    async def astream(self, system_prompt: str, user_prompt: str) -> AsyncIterator[str]:
+        if self.latency > 0:
+            await asyncio.sleep(self.latency)
+        for i, word in enumerate(self._template(user_prompt).split(" ")):
+            yield word if i == 0 else " " + word
+
+    @staticmethod
+    def _template(user_prompt: str) -> str:
+        courses = COURSE_HEADER_RE.findall(user_prompt)
+        if courses:
+            return "Offline answer based on: " + "; ".join(courses)
+
+        lines = [line for line in user_prompt.strip().splitlines() if line.strip()]
+        return "Offline answer: " + (lines[-1] if lines else "")
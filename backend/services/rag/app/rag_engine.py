@@ -1,14 +1,31 @@
+import asyncio
+import contextvars
+import hashlib
 import logging
 import os
+import threading
+from collections.abc import AsyncIterator, Iterator
+from contextlib import nullcontext
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError
 import ollama
-from openai import OpenAI
-
-from app.vector_store import VectorStore
-from app.course_loader import Course, get_course_by_code
-from app.rules import recommend_courses
+from openai import AsyncOpenAI, OpenAI
+
+from app.vector_store import VectorStore, course_metadata
+from app.index_backends import filter_conditions, matches_filters
+from app.catalog import CourseIndexes
+from app.course_loader import Course, CourseCatalog, extract_course_codes
+from app.rules import PreparedCourse, recommend_from_index
+from app.offline import EchoChat
+from app.answer_cache import SemanticAnswerCache
+from app.cache import LRUCache
+from app.context_builder import ContextBuilder, estimate_tokens
+from app.admission import AdmissionRejected, AsyncConcurrencyLimiter, ConcurrencyLimiter
 
 logger = logging.getLogger(__name__)
 
+GENERATION_ERROR_PREFIX = "Error generating response"
+NO_RESULTS_ANSWER = "I couldn't find any relevant course information to answer your question."
+
 SYSTEM_PROMPT = """You are a helpful academic advisor assistant for University of Florida students.
 Your role is to answer questions about courses, prerequisites, and academic planning.
 
@@ -16,6 +33,24 @@ Use the provided course information to answer questions accurately.
 If the information isn't in the context, say so honestly.
 Be concise but thorough. When mentioning courses, include the course code."""
 
+FALLBACK_EXPLANATION = "These courses were selected based on your interests and completed prerequisites."
+# kept briefly so a deferred request's token resolves, but the LLM is retried soon
+FALLBACK_EXPLANATION_TTL = 60.0
+
+
+EXPLAINED_COURSES = 5
+
+
+def _normalize_interests(interests: list[str]) -> list[str]:
+    return sorted({i.strip().lower() for i in interests if i.strip()})
+
+
+def _explanation_token(recommended: list[dict], interests: list[str]) -> str:
+    """Stable id for an explanation: the courses the prompt describes plus the interests."""
+    codes = [c.get("code", "") for c in recommended[:EXPLAINED_COURSES]]
+    key = "\x1f".join(codes) + "\x1e" + "\x1f".join(interests)
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()[:32]
+
 
 class RAGEngine:
     def __init__(
@@ -24,11 +59,36 @@ class RAGEngine:
         courses: list[Course],
         ollama_host: str = "http://localhost:11434",
         chat_model: str = "llama3.2",
-        llm_provider: str = "ollama",  # "ollama" or "openai"
+        llm_provider: str = "ollama",  # "ollama", "openai" or "offline"
         openai_api_key: str | None = None,
+        batch_generation_concurrency: int = 4,
+        offline_latency: float = 0.0,
+        answer_cache: SemanticAnswerCache | None = None,
+        explanation_concurrency: int = 2,
+        explanation_cache_size: int = 256,
+        explanation_cache_ttl: float = 3600.0,
+        context_builder: ContextBuilder | None = None,
+        chat_limiter: ConcurrencyLimiter | None = None,
+        async_chat_limiter: AsyncConcurrencyLimiter | None = None,
+        ollama_keep_alive: str | None = None,  # how long Ollama keeps the model loaded, e.g. "30m"
+        course_indexes: CourseIndexes | None = None,  # prebuilt for `courses`, e.g. from a catalog snapshot
     ):
         self.vector_store = vector_store
-        self.courses = courses
+        self.batch_generation_concurrency = max(1, batch_generation_concurrency)
+        self.answer_cache = answer_cache
+        self.context_builder = context_builder or ContextBuilder()
+        self.chat_limiter = chat_limiter
+        self.async_chat_limiter = async_chat_limiter
+        self.ollama_keep_alive = ollama_keep_alive
+        # explanation token -> text; tokens are derived from (courses, interests)
+        self.explanation_cache = LRUCache(max_size=explanation_cache_size, ttl_seconds=explanation_cache_ttl)
+        self._explanation_executor = ThreadPoolExecutor(
+            max_workers=max(1, explanation_concurrency), thread_name_prefix="explanation"
+        )
+        self._pending_explanations: dict[str, Future] = {}
+        self._pending_lock = threading.Lock()
+        self._course_state: tuple[list[Course], CourseIndexes] | None = None
+        self.set_courses(courses, course_indexes)
         self.chat_model = chat_model
         self.llm_provider = llm_provider.lower()
 
@@ -37,15 +97,74 @@ class RAGEngine:
             if not api_key:
                 raise ValueError("OPENAI_API_KEY is required when using OpenAI provider")
             self.openai_client = OpenAI(api_key=api_key)
+            self.async_openai_client = AsyncOpenAI(api_key=api_key)
             logger.info(f"Using OpenAI with model: {chat_model}")
+        elif self.llm_provider == "offline":
+            self.offline_client = EchoChat(latency=offline_latency)
+            logger.info(f"Using offline echo chat ({offline_latency * 1000:.0f}ms simulated latency)")
         else:
             self.ollama_host = ollama_host
             self.ollama_client = ollama.Client(host=ollama_host)
+            self.async_ollama_client = ollama.AsyncClient(host=ollama_host)
             logger.info(f"Using Ollama with model: {chat_model}")
 
+    def set_courses(self, courses: list[Course], indexes: CourseIndexes | None = None):
+        """Replace the course catalog, building its lookup structures unless `indexes` is given.
+
+        Safe while requests are running: the catalog and its indexes are
+        swapped as one reference, so each read sees either the old or the new
+        catalog in full.
+        """
+        indexes = indexes or CourseIndexes.build(courses)
+        replacing = self._course_state is not None
+        self._course_state = (courses, indexes)
+        if replacing:
+            # explanations describe course details that may have changed
+            self.explanation_cache.clear()
+
+    @property
+    def courses(self) -> list[Course]:
+        return self._course_state[0]
+
+    @property
+    def catalog(self) -> CourseCatalog:
+        return self._course_state[1].catalog
+
+    @property
+    def recommendation_index(self) -> list[PreparedCourse]:
+        return self._course_state[1].recommendation_index
+
+    def cache_stats(self) -> dict:
+        """Hit-rate stats of every cache on the query path (None for disabled caches)."""
+        return {
+            **self.vector_store.cache_stats(),
+            "answers": self.answer_cache.stats() if self.answer_cache else None,
+            "explanations": self.explanation_cache.stats(),
+        }
+
+    def preload_model(self) -> bool:
+        """Make the chat model resident in Ollama (and reset its keep_alive timer).
+
+        Returns False for providers with nothing to load.
+        """
+        if self.llm_provider in ("openai", "offline"):
+            return False
+        # an empty prompt only loads the model, nothing is generated
+        self.ollama_client.generate(model=self.chat_model, prompt="", keep_alive=self.ollama_keep_alive)
+        return True
+
+    def _admit(self):
+        return self.chat_limiter.acquire() if self.chat_limiter else nullcontext()
+
     def _chat(self, system_prompt: str, user_prompt: str) -> str:
-        """Unified chat method that works with both Ollama and OpenAI."""
-        if self.llm_provider == "openai":
+        """Unified chat method that works with Ollama, OpenAI and the offline echo provider."""
+        with self._admit():
+            return self._chat_unlimited(system_prompt, user_prompt)
+
+    def _chat_unlimited(self, system_prompt: str, user_prompt: str) -> str:
+        if self.llm_provider == "offline":
+            return self.offline_client.chat(system_prompt, user_prompt)
+        elif self.llm_provider == "openai":
             response = self.openai_client.chat.completions.create(
                 model=self.chat_model,
                 messages=[
@@ -61,53 +180,466 @@ class RAGEngine:
                     {"role": "system", "content": system_prompt},
                     {"role": "user", "content": user_prompt},
                 ],
+                keep_alive=self.ollama_keep_alive,
             )
             return response['message']['content']
 
-    def query(self, question: str, max_results: int = 5) -> dict:
-        # Search for relevant courses
-        search_results = self.vector_store.search(question, n_results=max_results)
+    def _chat_stream(self, system_prompt: str, user_prompt: str) -> Iterator[str]:
+        """Like `_chat`, but yields the answer in pieces as the model produces them."""
+        # the slot is held until the stream finishes or the consumer closes it
+        with self._admit():
+            yield from self._chat_stream_unlimited(system_prompt, user_prompt)
+
+    def _chat_stream_unlimited(self, system_prompt: str, user_prompt: str) -> Iterator[str]:
+        messages = [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_prompt},
+        ]
+        if self.llm_provider == "offline":
+            yield from self.offline_client.stream(system_prompt, user_prompt)
+        elif self.llm_provider == "openai":
+            stream = self.openai_client.chat.completions.create(
+                model=self.chat_model,
+                messages=messages,
+                stream=True,
+            )
+            for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+        else:
+            stream = self.ollama_client.chat(
+                model=self.chat_model,
+                messages=messages,
+                stream=True,
+                keep_alive=self.ollama_keep_alive,
+            )
+            for chunk in stream:
+                content = chunk['message']['content']
+                if content:
+                    yield content
+
+    def _aadmit(self):
+        return self.async_chat_limiter.acquire() if self.async_chat_limiter else nullcontext()
+
+    async def _achat(self, system_prompt: str, user_prompt: str) -> str:
+        """Awaitable `_chat` using the async provider clients."""
+        messages = [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_prompt},
+        ]
+        async with self._aadmit():
+            if self.llm_provider == "offline":
+                return await self.offline_client.achat(system_prompt, user_prompt)
+            elif self.llm_provider == "openai":
+                response = await self.async_openai_client.chat.completions.create(
+                    model=self.chat_model,
+                    messages=messages,
+                )
+                return response.choices[0].message.content
+            else:
+                response = await self.async_ollama_client.chat(
+                    model=self.chat_model,
+                    messages=messages,
+                    keep_alive=self.ollama_keep_alive,
+                )
+                return response['message']['content']
+
+    async def _achat_stream(self, system_prompt: str, user_prompt: str) -> AsyncIterator[str]:
+        """Awaitable `_chat_stream`."""
+        messages = [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_prompt},
+        ]
+        async with self._aadmit():
+            if self.llm_provider == "offline":
+                async for delta in self.offline_client.astream(system_prompt, user_prompt):
+                    yield delta
+            elif self.llm_provider == "openai":
+                stream = await self.async_openai_client.chat.completions.create(
+                    model=self.chat_model,
+                    messages=messages,
+                    stream=True,
+                )
+                async for chunk in stream:
+                    if chunk.choices and chunk.choices[0].delta.content:
+                        yield chunk.choices[0].delta.content
+            else:
+                stream = await self.async_ollama_client.chat(
+                    model=self.chat_model,
+                    messages=messages,
+                    stream=True,
+                    keep_alive=self.ollama_keep_alive,
+                )
+                async for chunk in stream:
+                    content = chunk['message']['content']
+                    if content:
+                        yield content
+
+    def query(
+        self,
+        question: str,
+        max_results: int = 5,
+        filters: dict | None = None,
+        search_mode: str | None = None,
+    ) -> dict:
+        search_results = self._retrieve(question, max_results, filters, search_mode)
+        return self._answer(question, search_results, filters)
+
+    def query_many(
+        self,
+        questions: list[str],
+        max_results: int = 5,
+        filters: dict | None = None,
+        search_mode: str | None = None,
+        sources_only: bool = False,
+    ) -> list[dict]:
+        """Answer several questions with batched retrieval.
+
+        All questions share one embedding call and one index query; answers are
+        then generated concurrently unless `sources_only` is set.
+        """
+        retrieved = self._retrieve_many(questions, max_results, filters, search_mode)
+
+        if sources_only:
+            return [{"answer": "", "sources": sources} for sources in retrieved]
+
+        workers = min(self.batch_generation_concurrency, len(questions)) or 1
+        # run each answer in the caller's context so it keeps the request deadline
+        contexts = [contextvars.copy_context() for _ in questions]
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="batch-answer") as pool:
+            return list(pool.map(lambda ctx, q, r: ctx.run(self._answer, q, r, filters), contexts, questions, retrieved))
+
+    def query_stream(
+        self,
+        question: str,
+        max_results: int = 5,
+        filters: dict | None = None,
+        search_mode: str | None = None,
+    ) -> Iterator[dict]:
+        """Stream a query: one {"sources": [...]} event, then {"delta": str} events.
+
+        When a prompt is sent to the LLM, a {"prompt_usage": dict} event
+        precedes the deltas. Generation errors are reported as a final
+        {"error": str} event.
+        """
+        search_results = self._retrieve(question, max_results, filters, search_mode)
+        yield {"sources": search_results}
 
         if not search_results:
-            return {
-                "answer": "I couldn't find any relevant course information to answer your question.",
-                "sources": [],
-            }
+            yield {"delta": NO_RESULTS_ANSWER}
+            return
 
-        # Building the context from search results
-        context_parts = []
-        for i, result in enumerate(search_results, 1):
-            context_parts.append(f"[Course {i}]\n{result['content']}")
+        question_embedding, cached = self._cached_answer(question, search_results)
+        if cached is not None:
+            yield {"delta": cached}
+            return
+
+        user_prompt, prompt_usage = self._build_prompt(question, search_results, filters)
+        yield {"prompt_usage": prompt_usage}
+
+        parts = []
+        try:
+            for delta in self._chat_stream(SYSTEM_PROMPT, user_prompt):
+                parts.append(delta)
+                yield {"delta": delta}
+        except AdmissionRejected:
+            raise
+        except Exception as e:
+            logger.error(f"Error streaming from LLM: {e}")
+            yield {"error": f"{GENERATION_ERROR_PREFIX}: {str(e)}"}
+            return
+
+        self._cache_answer(question_embedding, search_results, "".join(parts))
+
+    async def aquery(
+        self,
+        question: str,
+        max_results: int = 5,
+        filters: dict | None = None,
+        search_mode: str | None = None,
+    ) -> dict:
+        """Awaitable `query`: embedding and generation are awaited, not run on threads."""
+        search_results = (await self._aretrieve_many([question], max_results, filters, search_mode))[0]
+        return await self._aanswer(question, search_results, filters)
+
+    async def aquery_many(
+        self,
+        questions: list[str],
+        max_results: int = 5,
+        filters: dict | None = None,
+        search_mode: str | None = None,
+        sources_only: bool = False,
+    ) -> list[dict]:
+        """Awaitable `query_many`; answers are generated concurrently (bounded by the chat limiter)."""
+        retrieved = await self._aretrieve_many(questions, max_results, filters, search_mode)
+
+        if sources_only:
+            return [{"answer": "", "sources": sources} for sources in retrieved]
+
+        return list(await asyncio.gather(*(
+            self._aanswer(question, sources, filters) for question, sources in zip(questions, retrieved)
+        )))
+
+    async def aquery_stream(
+        self,
+        question: str,
+        max_results: int = 5,
+        filters: dict | None = None,
+        search_mode: str | None = None,
+    ) -> AsyncIterator[dict]:
+        """Awaitable `query_stream`, yielding the same events."""
+        search_results = (await self._aretrieve_many([question], max_results, filters, search_mode))[0]
+        yield {"sources": search_results}
 
-        context = "\n\n".join(context_parts)
+        if not search_results:
+            yield {"delta": NO_RESULTS_ANSWER}
+            return
+
+        question_embedding, cached = await self._acached_answer(question, search_results)
+        if cached is not None:
+            yield {"delta": cached}
+            return
+
+        user_prompt, prompt_usage = self._build_prompt(question, search_results, filters)
+        yield {"prompt_usage": prompt_usage}
+
+        parts = []
+        try:
+            async for delta in self._achat_stream(SYSTEM_PROMPT, user_prompt):
+                parts.append(delta)
+                yield {"delta": delta}
+        except AdmissionRejected:
+            raise
+        except Exception as e:
+            logger.error(f"Error streaming from LLM: {e}")
+            yield {"error": f"{GENERATION_ERROR_PREFIX}: {str(e)}"}
+            return
+
+        self._cache_answer(question_embedding, search_results, "".join(parts))
+
+    def _cached_answer(self, question: str, search_results: list[dict]) -> tuple[list[float] | None, str | None]:
+        """Return (question embedding, cached answer or None) from the semantic answer cache."""
+        if self.answer_cache is None or self._pinned_only(question, search_results):
+            return None, None
+        try:
+            # usually a query-embedding cache hit: retrieval just embedded this question
+            question_embedding = self.vector_store.embed_query(question)
+        except Exception as e:
+            logger.warning(f"Skipping answer cache, could not embed question: {e}")
+            return None, None
+
+        answer = self.answer_cache.get(question_embedding, search_results, self.vector_store.index_version)
+        if answer is not None:
+            logger.info("Answer cache hit")
+        return question_embedding, answer
+
+    async def _acached_answer(self, question: str, search_results: list[dict]) -> tuple[list[float] | None, str | None]:
+        if self.answer_cache is None or self._pinned_only(question, search_results):
+            return None, None
+        try:
+            question_embedding = (await self.vector_store.aembed_queries([question]))[0]
+        except Exception as e:
+            logger.warning(f"Skipping answer cache, could not embed question: {e}")
+            return None, None
+
+        answer = self.answer_cache.get(question_embedding, search_results, self.vector_store.index_version)
+        if answer is not None:
+            logger.info("Answer cache hit")
+        return question_embedding, answer
+
+    @staticmethod
+    def _pinned_only(question: str, search_results: list[dict]) -> bool:
+        # every source was named by code, so retrieval never embedded the question;
+        # embedding it just for a cache lookup would cost a model call on a cache miss
+        named = set(extract_course_codes(question))
+        return all(result["course_code"] in named for result in search_results)
+
+    def _cache_answer(self, question_embedding: list[float] | None, search_results: list[dict], answer: str):
+        if self.answer_cache is not None and question_embedding is not None and answer:
+            self.answer_cache.put(question_embedding, search_results, answer, self.vector_store.index_version)
+
+    def _build_prompt(self, question: str, search_results: list[dict], filters: dict | None = None) -> tuple[str, dict]:
+        """Return the user prompt and its token usage for the request's result."""
+        # Building the context from search results
+        context = self.context_builder.build(question, search_results, filters)
 
         # Building up the prompt
-        user_prompt = f"""Based on the following course information, please answer the question.
+        prompt = f"""Based on the following course information, please answer the question.
 
 Course Information:
-{context}
+{context.text}
 
 Question: {question}
 
 Answer:"""
 
+        usage = {
+            "prompt_tokens": estimate_tokens(SYSTEM_PROMPT) + estimate_tokens(prompt),
+            "dropped_tokens": context.dropped_tokens,
+            "dropped_sources": context.dropped_sources,
+        }
+        return prompt, usage
+
+    def _answer(self, question: str, search_results: list[dict], filters: dict | None = None) -> dict:
+        if not search_results:
+            return {
+                "answer": NO_RESULTS_ANSWER,
+                "sources": [],
+            }
+
+        question_embedding, cached = self._cached_answer(question, search_results)
+        if cached is not None:
+            return {
+                "answer": cached,
+                "sources": search_results,
+            }
+
+        user_prompt, prompt_usage = self._build_prompt(question, search_results, filters)
+
         # Call LLM (Ollama or OpenAI)
         try:
             answer = self._chat(SYSTEM_PROMPT, user_prompt)
+        except AdmissionRejected:
+            raise
         except Exception as e:
             logger.error(f"Error calling LLM: {e}")
             return {
-                "answer": f"Error generating response: {str(e)}",
+                "answer": f"{GENERATION_ERROR_PREFIX}: {str(e)}",
                 "sources": search_results,
+                "prompt_usage": prompt_usage,
             }
 
+        self._cache_answer(question_embedding, search_results, answer)
         return {
             "answer": answer,
             "sources": search_results,
+            "prompt_usage": prompt_usage,
         }
 
+    async def _aanswer(self, question: str, search_results: list[dict], filters: dict | None = None) -> dict:
+        if not search_results:
+            return {
+                "answer": NO_RESULTS_ANSWER,
+                "sources": [],
+            }
+
+        question_embedding, cached = await self._acached_answer(question, search_results)
+        if cached is not None:
+            return {
+                "answer": cached,
+                "sources": search_results,
+            }
+
+        user_prompt, prompt_usage = self._build_prompt(question, search_results, filters)
+
+        try:
+            answer = await self._achat(SYSTEM_PROMPT, user_prompt)
+        except AdmissionRejected:
+            raise
+        except Exception as e:
+            logger.error(f"Error calling LLM: {e}")
+            return {
+                "answer": f"{GENERATION_ERROR_PREFIX}: {str(e)}",
+                "sources": search_results,
+                "prompt_usage": prompt_usage,
+            }
+
+        self._cache_answer(question_embedding, search_results, answer)
+        return {
+            "answer": answer,
+            "sources": search_results,
+            "prompt_usage": prompt_usage,
+        }
+
+    def _retrieve(
+        self,
+        question: str,
+        max_results: int,
+        filters: dict | None = None,
+        search_mode: str | None = None,
+    ) -> list[dict]:
+        return self._retrieve_many([question], max_results, filters, search_mode)[0]
+
+    def _retrieve_many(
+        self,
+        questions: list[str],
+        max_results: int,
+        filters: dict | None = None,
+        search_mode: str | None = None,
+    ) -> list[list[dict]]:
+        """Pin courses each question names by code, then fill remaining slots with search."""
+        pinned_per_question = self._pin_courses(questions, max_results, filters)
+
+        # questions whose slots are all exact code matches need no embedding or ANN search
+        needs_search = [i for i, pinned in enumerate(pinned_per_question) if len(pinned) < max_results]
+        searched = {}
+        if needs_search:
+            # Search for relevant courses; fetching max_results per question leaves
+            # room to skip results that duplicate a pinned course
+            batch_results = self.vector_store.search_many(
+                [questions[i] for i in needs_search],
+                n_results=max_results,
+                filters=filters,
+                mode=search_mode,
+            )
+            searched = dict(zip(needs_search, batch_results))
+
+        return self._merge_pinned(pinned_per_question, searched, max_results)
+
+    async def _aretrieve_many(
+        self,
+        questions: list[str],
+        max_results: int,
+        filters: dict | None = None,
+        search_mode: str | None = None,
+    ) -> list[list[dict]]:
+        pinned_per_question = self._pin_courses(questions, max_results, filters)
+
+        needs_search = [i for i, pinned in enumerate(pinned_per_question) if len(pinned) < max_results]
+        searched = {}
+        if needs_search:
+            batch_results = await self.vector_store.asearch_many(
+                [questions[i] for i in needs_search],
+                n_results=max_results,
+                filters=filters,
+                mode=search_mode,
+            )
+            searched = dict(zip(needs_search, batch_results))
+
+        return self._merge_pinned(pinned_per_question, searched, max_results)
+
+    def _pin_courses(self, questions: list[str], max_results: int, filters: dict | None = None) -> list[list[dict]]:
+        # a named course is only pinned if search would also have been allowed to return it
+        conditions = filter_conditions(filters)
+        pinned_per_question = []
+        for question in questions:
+            pinned = []
+            for code in extract_course_codes(question):
+                if len(pinned) == max_results:
+                    break
+                course = self.catalog.get(code)
+                if course and matches_filters(course_metadata(course), conditions):
+                    pinned.append({
+                        "content": course.to_document(),
+                        "course_code": course.code,
+                        "course_name": course.name,
+                        "relevance_score": 1.0,
+                    })
+            pinned_per_question.append(pinned)
+        return pinned_per_question
+
+    @staticmethod
+    def _merge_pinned(pinned_per_question: list[list[dict]], searched: dict[int, list[dict]], max_results: int) -> list[list[dict]]:
+        results = []
+        for i, pinned in enumerate(pinned_per_question):
+            remaining = max_results - len(pinned)
+            pinned_codes = {result["course_code"] for result in pinned}
+            extra = [r for r in searched.get(i, []) if r["course_code"] not in pinned_codes]
+            results.append(pinned + extra[:remaining])
+        return results
+
     def get_course_info(self, course_code: str) -> dict:
-        course = get_course_by_code(self.courses, course_code)
+        course = self.catalog.get(course_code)
 
         if not course:
             return {
@@ -123,8 +655,8 @@ Answer:"""
             "prerequisites": course.prerequisites,
             "credits": course.credits,
             "department": course.department,
-            "instructors": course.instructors,
-            "meeting_times": course.meeting_times,
+            "instructors": list(course.instructors),
+            "meeting_times": [mt.to_dict() for mt in course.meeting_times],
         }
 
     def recommend(
@@ -134,23 +666,17 @@ Answer:"""
         max_credits: int = 15,
         term: str = "",
         level: str = "undergrad",
+        defer_explanation: bool = False,
     ) -> dict:
-        # Convert courses to dict format for rules engine
-        courses_dict = []
-        for course in self.courses:
-            courses_dict.append({
-                "code": course.code,
-                "name": course.name,
-                "title": course.name,
-                "description": course.description,
-                "prerequisites": course.prerequisites,
-                "credits": course.credits,
-                "department": course.department,
-            })
+        """Rank courses for a student and explain the picks.
 
+        With `defer_explanation`, the result carries an "explanation_token"
+        for `get_explanation` instead of waiting on the LLM, unless the
+        explanation is already cached.
+        """
         # Get recommendations using rules engine
-        recommended = recommend_courses(
-            courses=courses_dict,
+        recommended = recommend_from_index(
+            self.recommendation_index,
             completed=set(completed_courses),
             interests=interests,
             max_credits=max_credits,
@@ -168,31 +694,86 @@ Answer:"""
         # Calculate total credits
         total_credits = sum(c.get("credits", 3) for c in recommended)
 
-        # Generate explanation using LLM
-        explanation = self._generate_recommendation_explanation(
-            recommended, completed_courses, interests
-        )
-
-        return {
+        result = {
             "courses": recommended,
             "total_credits": total_credits,
-            "explanation": explanation,
         }
 
+        # Generate explanation using LLM
+        interests = _normalize_interests(interests)
+        token = _explanation_token(recommended, interests)
+        explanation = self.explanation_cache.get(token)
+        if explanation is None:
+            if defer_explanation:
+                self._submit_explanation(token, recommended, interests)
+                result["explanation_token"] = token
+                return result
+            # on the request thread: the explanation executor only serves deferred requests
+            try:
+                explanation = self._generate_recommendation_explanation(token, recommended, interests)
+            except AdmissionRejected as e:
+                # the courses are ranked already; only the explanation falls back (uncached)
+                logger.warning(f"Using the fallback explanation: {e}")
+                explanation = FALLBACK_EXPLANATION
+
+        result["explanation"] = explanation
+        return result
+
+    def get_explanation(self, token: str, timeout: float = 0.0) -> dict:
+        """Look up a deferred explanation, waiting up to `timeout` seconds for it.
+
+        Returns {"ready": bool, "explanation": str}; raises KeyError for a
+        token that is unknown or whose explanation has expired.
+        """
+        # pending first: a finished job is cached before it leaves the pending map
+        with self._pending_lock:
+            future = self._pending_explanations.get(token)
+
+        if future is None:
+            explanation = self.explanation_cache.get(token)
+            if explanation is None:
+                raise KeyError(token)
+            return {"ready": True, "explanation": explanation}
+
+        try:
+            return {"ready": True, "explanation": future.result(timeout=max(0.0, timeout))}
+        except TimeoutError:
+            return {"ready": False, "explanation": ""}
+
+    def _submit_explanation(self, token: str, recommended: list[dict], interests: list[str]) -> Future:
+        # concurrent requests for the same token share one generation
+        with self._pending_lock:
+            future = self._pending_explanations.get(token)
+            if future is not None:
+                return future
+            future = self._explanation_executor.submit(
+                self._generate_recommendation_explanation, token, recommended, interests
+            )
+            self._pending_explanations[token] = future
+        # registered outside the lock: the callback runs inline if the future already finished
+        future.add_done_callback(lambda _: self._forget_pending(token))
+        return future
+
+    def _forget_pending(self, token: str):
+        with self._pending_lock:
+            self._pending_explanations.pop(token, None)
+
     def _generate_recommendation_explanation(
         self,
+        token: str,
         recommended: list[dict],
-        completed: list[str],
         interests: list[str],
     ) -> str:
         course_list = "\n".join([
             f"- {c.get('code', '')} {c.get('name', '')}: {c.get('description', '')[:100]}..."
-            for c in recommended[:5]
+            for c in recommended[:EXPLAINED_COURSES]
         ])
 
+        # completed courses are left out so the explanation depends only on
+        # what the cache key covers; prerequisites are already reflected in
+        # which courses were recommended
         prompt = f"""As an academic advisor, briefly explain why these courses are recommended for a student.
 
-Student has completed: {', '.join(completed) if completed else 'No courses yet'}
 Student interests: {', '.join(interests) if interests else 'General'}
 
 Recommended courses:
@@ -201,7 +782,13 @@ Recommended courses:
 Provide a brief (2-3 sentences) explanation of why these courses are a good fit:"""
 
         try:
-            return self._chat(SYSTEM_PROMPT, prompt)
+            explanation = self._chat(SYSTEM_PROMPT, prompt)
+        except AdmissionRejected:
+            raise
         except Exception as e:
             logger.error(f"Error generating explanation: {e}")
-            return "These courses were selected based on your interests and completed prerequisites."
+            self.explanation_cache.put(token, FALLBACK_EXPLANATION, ttl_seconds=FALLBACK_EXPLANATION_TTL)
+            return FALLBACK_EXPLANATION
+
+        self.explanation_cache.put(token, explanation)
+        return explanation
@@ -1,5 +1,6 @@
 import re
-from typing import List, Dict, Set, Any
+from dataclasses import dataclass
+from typing import List, Dict, Set, Any, FrozenSet, Tuple
 
 
 def parse_prereqs(prereq_text: str) -> List[Dict]:
@@ -76,56 +77,134 @@ def score_course(course: Dict[str, Any], profile: Dict[str, Any]) -> float:
     return score
 
 
-def recommend_courses(
-    courses: List[Dict[str, Any]],
+@dataclass(frozen=True)
+class PreparedCourse:
+    """Student-independent parts of a course, computed once per catalog load."""
+    course: Dict[str, Any]
+    code: str
+    prereq_groups: Tuple[Tuple[str, FrozenSet[str]], ...]  # ("all_of" | "any_of", normalized codes)
+    text: str  # lower-cased title, description and tags for interest matching
+    credits: int  # credits used for the max_credits budget
+    credit_bonus: float
+    offered_terms: FrozenSet[str]
+    level: Any
+
+
+def _credits_or_default(credits: Any) -> Tuple[int, bool]:
+    """Return (credits for budgeting, whether the value parsed)."""
+    try:
+        return (int(credits) if credits else 3), True
+    except (ValueError, TypeError):
+        return 3, False
+
+
+def prepare_course(course: Dict[str, Any]) -> PreparedCourse:
+    code = (course.get("code") or course.get("course_code", "")).replace(" ", "").upper()
+
+    prereq_text = course.get("prerequisites", "") or course.get("prereq_text", "")
+    prereq_json = parse_prereqs(prereq_text) if isinstance(prereq_text, str) else prereq_text
+    groups = []
+    for group in prereq_json or []:
+        for kind in ("all_of", "any_of"):
+            if kind in group:
+                groups.append((kind, frozenset(c.replace(" ", "").upper() for c in group[kind])))
+
+    text = " ".join([
+        course.get("title", "") or course.get("name", ""),
+        course.get("description", ""),
+        " ".join(course.get("tags", []) or [])
+    ]).lower()
+
+    credits, parsed = _credits_or_default(course.get("credits", 3))
+
+    return PreparedCourse(
+        course=course,
+        code=code,
+        prereq_groups=tuple(groups),
+        text=text,
+        credits=credits,
+        credit_bonus=0.1 if parsed and 3 <= credits <= 4 else 0.0,
+        offered_terms=frozenset(t.lower() for t in course.get("offered_terms", []) or []),
+        level=course.get("level"),
+    )
+
+
+def build_recommendation_index(courses: List[Dict[str, Any]]) -> List[PreparedCourse]:
+    return [prepare_course(course) for course in courses]
+
+
+def recommend_from_index(
+    index: List[PreparedCourse],
     completed: Set[str],
     interests: List[str],
     max_credits: int = 15,
     term: str = "",
     level: str = "undergrad"
 ) -> List[Dict[str, Any]]:
+    """Same results as `recommend_courses`, evaluating only the student-specific parts."""
     completed_normalized = {c.replace(" ", "").upper() for c in completed}
-
-    profile = {
-        "interests": interests,
-        "term": term,
-        "level": level,
-    }
+    interests_lower = [s.lower() for s in interests]
+    term_lower = (term or "").lower()
 
     viable = []
-    for course in courses:
-        code = (course.get("code") or course.get("course_code", "")).replace(" ", "").upper()
-
-        if code in completed_normalized:
+    for prepared in index:
+        if prepared.code in completed_normalized:
             continue
 
-        prereq_text = course.get("prerequisites", "") or course.get("prereq_text", "")
-        prereq_json = parse_prereqs(prereq_text) if isinstance(prereq_text, str) else prereq_text
-
-        if not has_prereqs(completed_normalized, prereq_json):
+        satisfied = True
+        for kind, codes in prepared.prereq_groups:
+            if kind == "all_of" and not codes <= completed_normalized:
+                satisfied = False
+                break
+            if kind == "any_of" and completed_normalized.isdisjoint(codes):
+                satisfied = False
+                break
+        if not satisfied:
             continue
 
-        course_copy = course.copy()
-        course_copy["_score"] = score_course(course, profile)
-        viable.append(course_copy)
+        score = 0.0
+        for interest in interests_lower:
+            if interest in prepared.text:
+                score += 1.0
+        if term_lower and term_lower in prepared.offered_terms:
+            score += 0.5
+        if level and prepared.level == level:
+            score += 0.2
+        score += prepared.credit_bonus
+
+        viable.append((score, prepared))
 
-    viable.sort(key=lambda x: x["_score"], reverse=True)
+    viable.sort(key=lambda x: x[0], reverse=True)
 
     selected = []
     total_credits = 0
 
-    for course in viable:
-        credits = course.get("credits", 3)
-        try:
-            credits = int(credits) if credits else 3
-        except (ValueError, TypeError):
-            credits = 3
-
-        if total_credits + credits <= max_credits:
-            selected.append(course)
-            total_credits += credits
+    for score, prepared in viable:
+        if total_credits + prepared.credits <= max_credits:
+            course_copy = prepared.course.copy()
+            course_copy["_score"] = score
+            selected.append(course_copy)
+            total_credits += prepared.credits
 
         if total_credits >= max_credits - 1:
             break
 
-    return selected
\ No newline at end of file
+    return selected
+
+
+def recommend_courses(
+    courses: List[Dict[str, Any]],
+    completed: Set[str],
+    interests: List[str],
+    max_credits: int = 15,
+    term: str = "",
+    level: str = "undergrad"
+) -> List[Dict[str, Any]]:
+    return recommend_from_index(
+        build_recommendation_index(courses),
+        completed=completed,
+        interests=interests,
+        max_credits=max_credits,
+        term=term,
+        level=level,
+    )
@@ -1,10 +1,15 @@
+import asyncio
 import os
 from app.grpc_server import serve
 
 
 def main():
     port = int(os.environ.get("GRPC_PORT", "50052"))
-    serve(port=port)
+    if os.environ.get("GRPC_ASYNC", "false").lower() in ("1", "true", "yes"):
+        from app.aio_server import serve_async
+        asyncio.run(serve_async(port=port))
+    else:
+        serve(port=port)
 
 
 if __name__ == "__main__":
@@ -1,14 +1,69 @@
+import asyncio
+import contextvars
+import hashlib
+import json
 import logging
 import os
-import chromadb
-from chromadb.config import Settings
+import re
+import threading
+import time
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from pathlib import Path
 import ollama
-from openai import OpenAI
+from openai import AsyncOpenAI, OpenAI
 
-from app.course_loader import Course
+from app.admission import AdmissionRejected, AsyncConcurrencyLimiter, ConcurrencyLimiter
+from app.course_loader import Course, lookup_key
+from app.cache import LRUCache
+from app.embedding_cache import EmbeddingCache
+from app.index_backends import IndexBackend, create_backend, list_backend_names
+from app.lexical_index import BM25Index, reciprocal_rank_fusion
+from app.offline import HashingEmbedder
 
 logger = logging.getLogger(__name__)
 
+# Records which index version each collection prefix currently serves
+ACTIVE_POINTER_FILE = "active_index.json"
+# bump when course_metadata changes, so existing versions are rebuilt (reusing their vectors)
+METADATA_VERSION = 2
+
+
+def content_hash(document: str, embedding_model: str) -> str:
+    # the model is part of the hash so switching models re-embeds everything
+    return hashlib.sha256(f"{embedding_model}\n{document}".encode("utf-8")).hexdigest()
+
+
+def course_metadata(course: Course) -> dict:
+    """Metadata stored with a course's document; search filters match against it."""
+    return {
+        "code": course.code,
+        "name": course.name,
+        # normalized like CourseCatalog's keys and filter values (index_backends.NORMALIZED_FIELDS)
+        "department": lookup_key(course.department),
+        "credits": course.credits,
+    }
+
+
+def normalize_query(query: str) -> str:
+    # case and whitespace differences shouldn't cost another embedding call
+    return " ".join(query.lower().split())
+
+
+def _slug(text: str, max_length: int = 24) -> str:
+    # index names must stay valid Chroma collection names / directory names
+    return re.sub(r"[^A-Za-z0-9-]+", "-", text).strip("-")[:max_length] or "model"
+
+
+def _to_result(hit: dict, score: float) -> dict:
+    return {
+        "content": hit["document"],
+        "course_code": hit["metadata"].get("code", ""),
+        "course_name": hit["metadata"].get("name", ""),
+        "relevance_score": score,
+    }
+
 
 class VectorStore:
     def __init__(
@@ -16,64 +71,325 @@ class VectorStore:
         ollama_host: str = "http://localhost:11434",
         embedding_model: str = "nomic-embed-text",
         persist_directory: str = "/app/data/chroma",
-        embedding_provider: str = "ollama",  # "ollama" or "openai"
+        embedding_provider: str = "ollama",  # "ollama", "openai" or "offline"
         openai_api_key: str | None = None,
+        embedding_batch_size: int = 50,
+        embedding_concurrency: int = 4,
+        embedding_max_retries: int = 3,
+        embedding_retry_backoff: float = 1.0,
+        embedding_cache: EmbeddingCache | None = None,
+        query_cache_size: int = 1024,
+        query_cache_ttl: float = 3600.0,
+        index_backend: str = "chroma",  # "chroma" or "numpy"
+        search_mode: str = "vector",  # "vector", "lexical" or "hybrid"
+        quantization: str = "none",  # "none", "float16" or "int8" (numpy backend only)
+        keep_versions: int = 1,
+        embedding_limiter: ConcurrencyLimiter | None = None,
+        async_embedding_limiter: AsyncConcurrencyLimiter | None = None,
+        ollama_keep_alive: str | None = None,  # how long Ollama keeps the model loaded, e.g. "30m"
     ):
         self.embedding_model = embedding_model
         self.embedding_provider = embedding_provider.lower()
+        self.embedding_batch_size = max(1, embedding_batch_size)
+        self.embedding_concurrency = max(1, embedding_concurrency)
+        self.embedding_max_retries = max(1, embedding_max_retries)
+        self.embedding_retry_backoff = embedding_retry_backoff
+        self.embedding_cache = embedding_cache
+        self.embedding_limiter = embedding_limiter
+        self.async_embedding_limiter = async_embedding_limiter
+        self.ollama_keep_alive = ollama_keep_alive
+        self.query_cache = LRUCache(query_cache_size, query_cache_ttl) if query_cache_size > 0 else None
+        self.search_mode = search_mode.lower()
+        self.index_backend = index_backend.lower()
+        self.persist_directory = persist_directory
+        self.quantization = quantization
+        # previous index versions kept around after a swap (for in-flight queries)
+        self.keep_versions = max(0, keep_versions)
 
         if self.embedding_provider == "openai":
             api_key = openai_api_key or os.getenv("OPENAI_API_KEY")
             if not api_key:
                 raise ValueError("OPENAI_API_KEY is required when using OpenAI embeddings")
             self.openai_client = OpenAI(api_key=api_key)
+            self.async_openai_client = AsyncOpenAI(api_key=api_key)
             logger.info(f"Using OpenAI embeddings with model: {embedding_model}")
+        elif self.embedding_provider == "offline":
+            self.offline_embedder = HashingEmbedder()
+            logger.info(f"Using offline feature-hashing embeddings ({self.offline_embedder.dim} dims)")
         else:
             self.ollama_host = ollama_host
             self.ollama_client = ollama.Client(host=ollama_host)
+            self.async_ollama_client = ollama.AsyncClient(host=ollama_host)
             logger.info(f"Using Ollama embeddings with model: {embedding_model}")
 
-        # Initialize ChromaDB with persistence
-        self.chroma_client = chromadb.Client(Settings(
-            persist_directory=persist_directory,
-            anonymized_telemetry=False,
-            is_persistent=True,
-        ))
+        # Index versions are named {prefix}{catalog_hash}. Embeddings from different
+        # providers and models are not compatible, so both are part of the prefix.
+        self.collection_prefix = f"courses_{self.embedding_provider}_{_slug(embedding_model)}_"
+        # single unversioned collection used before index versions existed; its
+        # metadata has no content hashes to reuse, so it is dropped after the first swap
+        self.legacy_collection = f"courses_{self.embedding_provider}"
+        self._pointer_path = Path(persist_directory) / ACTIVE_POINTER_FILE
+        self._build_lock = threading.Lock()
+        # (vector index, lexical index) of the live version, replaced as one tuple
+        self._active: tuple[IndexBackend | None, BM25Index] = (None, BM25Index())
+
+        active_name = self._read_pointer().get("active")
+        if active_name and active_name in list_backend_names(self.index_backend, persist_directory):
+            self._active = (self._open_backend(active_name), BM25Index())
 
-        # Use different collection names for different embedding providers
-        # (embeddings from different models are not compatible)
-        collection_name = f"courses_{self.embedding_provider}"
-        self.collection = self.chroma_client.get_or_create_collection(
-            name=collection_name,
-            metadata={"hnsw:space": "cosine"}
+        logger.info(
+            f"Vector store initialized with {self.index.count() if self.index else 0} documents in "
+            f"'{active_name or 'no index yet'}' ({index_backend} backend)"
         )
 
-        logger.info(f"Vector store initialized with {self.collection.count()} documents in '{collection_name}'")
+    @property
+    def index(self) -> IndexBackend | None:
+        return self._active[0]
 
-    def _get_embedding(self, text: str) -> list[float]:
+    @property
+    def lexical_index(self) -> BM25Index:
+        return self._active[1]
+
+    @property
+    def index_version(self) -> str:
+        """Name of the index version currently serving queries ("" before the first build)."""
+        index = self.index
+        return index.name if index else ""
+
+    def _open_backend(self, name: str) -> IndexBackend:
+        return create_backend(self.index_backend, self.persist_directory, name, quantization=self.quantization)
+
+    def _read_pointer(self) -> dict:
+        try:
+            return json.loads(self._pointer_path.read_text()).get(self.collection_prefix, {})
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable index pointer {self._pointer_path}: {e}")
+            return {}
+
+    def _write_pointer(self, entry: dict | None):
+        try:
+            pointers = json.loads(self._pointer_path.read_text())
+        except (OSError, ValueError):
+            pointers = {}
+
+        if entry is None:
+            pointers.pop(self.collection_prefix, None)
+        else:
+            pointers[self.collection_prefix] = entry
+
+        self._pointer_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self._pointer_path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps(pointers, indent=2))
+        os.replace(tmp_path, self._pointer_path)
+
+    def _embed_batch(self, texts: list[str]) -> list[list[float]]:
+        """Embed several texts with a single multi-input request."""
+        with self.embedding_limiter.acquire() if self.embedding_limiter else nullcontext():
+            return self._embed_batch_unlimited(texts)
+
+    def _embed_batch_unlimited(self, texts: list[str]) -> list[list[float]]:
         if self.embedding_provider == "openai":
             response = self.openai_client.embeddings.create(
                 model=self.embedding_model,
-                input=text
+                input=texts
             )
-            return response.data[0].embedding
+            # OpenAI returns one item per input, tagged with its position
+            return [item.embedding for item in sorted(response.data, key=lambda d: d.index)]
+        elif self.embedding_provider == "offline":
+            return self.offline_embedder.embed(texts)
         else:
             response = self.ollama_client.embed(
                 model=self.embedding_model,
-                input=text
+                input=texts,
+                keep_alive=self.ollama_keep_alive,
             )
-            return response['embeddings'][0]
+            return list(response['embeddings'])
+
+    def preload_model(self) -> bool:
+        """Make the embedding model resident in Ollama (and reset its keep_alive timer).
+
+        Returns False for providers with nothing to load.
+        """
+        if self.embedding_provider in ("openai", "offline"):
+            return False
+        self.ollama_client.embed(model=self.embedding_model, input="warmup", keep_alive=self.ollama_keep_alive)
+        return True
+
+    def _embed_batch_with_retry(self, texts: list[str], batch_number: int, total_batches: int) -> list[list[float]]:
+        for attempt in range(1, self.embedding_max_retries + 1):
+            try:
+                embeddings = self._embed_batch(texts)
+                if len(embeddings) != len(texts):
+                    raise ValueError(f"Expected {len(texts)} embeddings, got {len(embeddings)}")
+                logger.debug(f"Embedded batch {batch_number}/{total_batches} ({len(texts)} documents)")
+                return embeddings
+            except AdmissionRejected:
+                # retrying would only add load to a provider that is already saturated
+                raise
+            except Exception as e:
+                if attempt == self.embedding_max_retries:
+                    logger.error(f"Embedding batch {batch_number}/{total_batches} failed after {attempt} attempts: {e}")
+                    raise
+                delay = self.embedding_retry_backoff * (2 ** (attempt - 1))
+                logger.warning(
+                    f"Embedding batch {batch_number}/{total_batches} failed (attempt {attempt}): {e}; "
+                    f"retrying in {delay:.1f}s"
+                )
+                time.sleep(delay)
+
+    def _embed_uncached(self, texts: list[str]) -> list[list[float]]:
+        """Embed many texts, one request per batch with several batches in flight."""
+        if not texts:
+            return []
+
+        size = self.embedding_batch_size
+        batches = [texts[i:i + size] for i in range(0, len(texts), size)]
+        total = len(batches)
+
+        if total == 1:
+            return self._embed_batch_with_retry(batches[0], 1, 1)
+
+        workers = min(self.embedding_concurrency, total)
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="embed") as pool:
+            # map preserves batch order, so embeddings line up with the input texts
+            # each batch runs in a copy of the caller's context to keep any request deadline
+            contexts = [contextvars.copy_context() for _ in batches]
+            results = pool.map(
+                lambda ctx, *args: ctx.run(self._embed_batch_with_retry, *args),
+                contexts,
+                batches,
+                range(1, total + 1),
+                [total] * total,
+            )
+            embeddings = []
+            for batch_embeddings in results:
+                embeddings.extend(batch_embeddings)
+
+        return embeddings
 
-    def add_courses(self, courses: list[Course]) -> int:
-        # adding the courser to vector store
-        if not courses:
-            return 0
+    def _get_embeddings(self, texts: list[str]) -> list[list[float]]:
+        """Embed texts, serving previously seen ones from the embedding cache."""
+        if self.embedding_cache is None:
+            return self._embed_uncached(texts)
 
-        # check if already populated
-        if self.collection.count() > 0:
-            logger.info("Collection already has documents, skipping ingestion")
-            return self.collection.count()
+        cached = self.embedding_cache.get_many(self.embedding_provider, self.embedding_model, texts)
+        missing = [i for i, embedding in enumerate(cached) if embedding is None]
 
+        if missing:
+            missing_texts = [texts[i] for i in missing]
+            fresh = self._embed_uncached(missing_texts)
+            self.embedding_cache.put_many(self.embedding_provider, self.embedding_model, missing_texts, fresh)
+            for i, embedding in zip(missing, fresh):
+                cached[i] = embedding
+
+        return cached
+
+    def _get_embedding(self, text: str) -> list[float]:
+        return self._get_embeddings([text])[0]
+
+
+    async def _aembed_batch(self, texts: list[str]) -> list[list[float]]:
+        """Awaitable `_embed_batch` using the async provider clients."""
+        async with self.async_embedding_limiter.acquire() if self.async_embedding_limiter else nullcontext():
+            if self.embedding_provider == "openai":
+                response = await self.async_openai_client.embeddings.create(
+                    model=self.embedding_model,
+                    input=texts
+                )
+                return [item.embedding for item in sorted(response.data, key=lambda d: d.index)]
+            elif self.embedding_provider == "offline":
+                return self.offline_embedder.embed(texts)
+            else:
+                response = await self.async_ollama_client.embed(
+                    model=self.embedding_model,
+                    input=texts,
+                    keep_alive=self.ollama_keep_alive,
+                )
+                return list(response['embeddings'])
+
+    async def _aembed_batch_with_retry(self, texts: list[str]) -> list[list[float]]:
+        for attempt in range(1, self.embedding_max_retries + 1):
+            try:
+                embeddings = await self._aembed_batch(texts)
+                if len(embeddings) != len(texts):
+                    raise ValueError(f"Expected {len(texts)} embeddings, got {len(embeddings)}")
+                return embeddings
+            except AdmissionRejected:
+                raise
+            except Exception as e:
+                if attempt == self.embedding_max_retries:
+                    logger.error(f"Embedding batch failed after {attempt} attempts: {e}")
+                    raise
+                delay = self.embedding_retry_backoff * (2 ** (attempt - 1))
+                logger.warning(f"Embedding batch failed (attempt {attempt}): {e}; retrying in {delay:.1f}s")
+                await asyncio.sleep(delay)
+
+    async def _aget_embeddings(self, texts: list[str]) -> list[list[float]]:
+        """Awaitable `_get_embeddings`; all batches are requested concurrently."""
+        cached = [None] * len(texts)
+        if self.embedding_cache is not None:
+            # SQLite may block on a concurrent writer, so keep it off the event loop
+            cached = await asyncio.to_thread(
+                self.embedding_cache.get_many, self.embedding_provider, self.embedding_model, texts
+            )
+        missing = [i for i, embedding in enumerate(cached) if embedding is None]
+        if not missing:
+            return cached
+
+        missing_texts = [texts[i] for i in missing]
+        size = self.embedding_batch_size
+        batches = await asyncio.gather(*(
+            self._aembed_batch_with_retry(missing_texts[k:k + size])
+            for k in range(0, len(missing_texts), size)
+        ))
+        fresh = [embedding for batch in batches for embedding in batch]
+
+        if self.embedding_cache is not None:
+            await asyncio.to_thread(
+                self.embedding_cache.put_many, self.embedding_provider, self.embedding_model, missing_texts, fresh
+            )
+        for i, embedding in zip(missing, fresh):
+            cached[i] = embedding
+        return cached
+
+    def add_courses(self, courses: list[Course], on_swap: Callable[[], None] | None = None) -> int:
+        """Build (or reuse) the index version for `courses` and make it live.
+
+        Versions are keyed by a hash of the catalog, so an unchanged catalog is a
+        no-op. Otherwise a new version is built next to the live one while it
+        keeps serving queries: unchanged documents (same content hash in their
+        metadata) copy their vectors from the live version and only new or
+        changed documents are embedded. The new version is then swapped in
+        atomically and versions older than `keep_versions` are deleted.
+        Returns the number of documents in the live index.
+
+        `on_swap` is called just before the new version goes live (or when
+        the live one is already up to date), to publish state that must match
+        it, such as the course catalog. If it raises, the old version stays
+        live and the error propagates.
+        """
+        with self._build_lock:
+            if not courses:
+                if on_swap is not None:
+                    on_swap()
+                return 0
+            return self._build(courses, on_swap)
+
+    def rebuild_in_background(self, courses: list[Course]) -> threading.Thread:
+        """Run `add_courses` on a background thread; queries keep using the live version."""
+        def run():
+            try:
+                self.add_courses(courses)
+            except Exception as e:
+                logger.error(f"Background index rebuild failed, still serving '{self.index_version}': {e}")
+
+        thread = threading.Thread(target=run, name="index-rebuild", daemon=True)
+        thread.start()
+        return thread
+
+    def _build(self, courses: list[Course], on_swap: Callable[[], None] | None = None) -> int:
         # Keep first occurance
         seen_codes = set()
         unique_courses = []
@@ -84,77 +400,252 @@ class VectorStore:
 
         logger.info(f"Deduplicated {len(courses)} courses to {len(unique_courses)} unique courses")
 
-        documents = []
-        ids = []
-        metadatas = []
+        all_ids = []
+        all_documents = []
+        all_metadatas = []
 
         for course in unique_courses:
             doc_text = course.to_document()
-            documents.append(doc_text)
-            ids.append(course.code)
-            metadatas.append({
-                "code": course.code,
-                "name": course.name,
-                "department": course.department,
-                "credits": course.credits,
+            all_ids.append(course.code)
+            all_documents.append(doc_text)
+            all_metadatas.append({
+                **course_metadata(course),
+                "content_hash": content_hash(doc_text, self.embedding_model),
+                "embedding_model": self.embedding_model,
             })
 
-        # Generate embeddings in batches
-        logger.info(f"Generating embeddings for {len(documents)} courses...")
-        embeddings = []
-        batch_size = 50
-
-        for i in range(0, len(documents), batch_size):
-            batch = documents[i:i + batch_size]
-            logger.info(f"Processing batch {i // batch_size + 1}/{(len(documents) + batch_size - 1) // batch_size}")
-
-            for doc in batch:
-                embedding = self._get_embedding(doc)
-                embeddings.append(embedding)
-
-        # Add to collection
-        self.collection.add(
-            documents=documents,
-            embeddings=embeddings,
-            ids=ids,
-            metadatas=metadatas,
-        )
+        catalog_hash = hashlib.sha256(
+            f"metadata-v{METADATA_VERSION}\n".encode("utf-8")
+            + "\n".join(f"{doc_id}:{m['content_hash']}" for doc_id, m in zip(all_ids, all_metadatas)).encode("utf-8")
+        ).hexdigest()[:12]
+        version = self.collection_prefix + catalog_hash
 
-        logger.info(f"Added {len(documents)} courses to vector store")
-        return len(documents)
+        live, live_lexical = self._active
+        if live is not None and live.name == version:
+            logger.info(f"Index '{version}' is already up to date")
+            if on_swap is not None:
+                on_swap()
+            if len(live_lexical) != len(all_ids):
+                lexical = BM25Index()
+                lexical.build(all_ids, all_documents, all_metadatas)
+                self._active = (live, lexical)
+            return live.count()
 
-    def search(self, query: str, n_results: int = 5) -> list[dict]:
-        query_embedding = self._get_embedding(query)
+        # Reuse vectors of documents whose content hash matches the live version
+        existing_hashes = {}
+        if live is not None:
+            existing_hashes = {doc_id: m.get("content_hash") for doc_id, m in live.get_metadatas().items()}
+        unchanged_ids = [
+            doc_id for doc_id, m in zip(all_ids, all_metadatas)
+            if existing_hashes.get(doc_id) == m["content_hash"]
+        ]
+        embeddings_by_id = live.get_embeddings(unchanged_ids) if unchanged_ids else {}
 
-        results = self.collection.query(
-            query_embeddings=[query_embedding],
-            n_results=n_results,
-            include=["documents", "metadatas", "distances"]
+        changed = [i for i, doc_id in enumerate(all_ids) if doc_id not in embeddings_by_id]
+        removed = sum(1 for doc_id in existing_hashes if doc_id not in seen_codes)
+
+        logger.info(
+            f"Catalog diff: {len(changed)} new or changed, {len(embeddings_by_id)} unchanged, {removed} removed"
         )
 
-        search_results = []
-        if results and results['documents']:
-            for i, doc in enumerate(results['documents'][0]):
-                metadata = results['metadatas'][0][i] if results['metadatas'] else {}
-                distance = results['distances'][0][i] if results['distances'] else 0
+        if changed:
+            # Generate embeddings in batches
+            logger.info(
+                f"Generating embeddings for {len(changed)} courses "
+                f"(batch size {self.embedding_batch_size}, concurrency {self.embedding_concurrency})..."
+            )
+            start = time.perf_counter()
+            fresh = self._get_embeddings([all_documents[i] for i in changed])
+            logger.info(f"Generated {len(fresh)} embeddings in {time.perf_counter() - start:.2f}s")
+            for i, embedding in zip(changed, fresh):
+                embeddings_by_id[all_ids[i]] = embedding
+
+        # Build the new version beside the live one
+        start = time.perf_counter()
+        backend = self._open_backend(version)
+        backend.reset()  # discard leftovers of an interrupted build
+        backend.upsert(
+            ids=all_ids,
+            embeddings=[embeddings_by_id[doc_id] for doc_id in all_ids],
+            documents=all_documents,
+            metadatas=all_metadatas,
+        )
+        lexical = BM25Index()
+        lexical.build(all_ids, all_documents, all_metadatas)
+        logger.info(f"Built index version '{version}' in {time.perf_counter() - start:.2f}s")
+
+        self._swap(backend, lexical, on_swap)
+
+        count = backend.count()
+        logger.info(f"Vector store synced: {count} courses indexed in '{version}'")
+        if self.embedding_cache is not None:
+            logger.info(f"Embedding cache stats: {self.embedding_cache.stats()}")
+        return count
+
+    def _swap(self, backend: IndexBackend, lexical: BM25Index, on_swap: Callable[[], None] | None = None):
+        previous_entry = self._read_pointer()
+        old = self.index
+
+        history = []
+        if old is not None and old.name != backend.name:
+            history.append(old.name)
+        history.extend(name for name in previous_entry.get("previous", []) if name not in (backend.name, *history))
+        history = history[:self.keep_versions]
+
+        if on_swap is not None:
+            on_swap()
+        # a single reference assignment: readers see either the old or the new pair
+        self._active = (backend, lexical)
+        self._write_pointer({"active": backend.name, "previous": history})
+        logger.info(f"Swapped live index from '{old.name if old else 'none'}' to '{backend.name}'")
+
+        self._collect_garbage(keep={backend.name, *history})
+
+    def _collect_garbage(self, keep: set[str]):
+        for name in list_backend_names(self.index_backend, self.persist_directory):
+            legacy = name == self.legacy_collection and self.index_backend == "chroma"
+            if (legacy or name.startswith(self.collection_prefix)) and name not in keep:
+                try:
+                    self._open_backend(name).drop()
+                    logger.info(f"Deleted old index version '{name}'")
+                except Exception as e:
+                    logger.warning(f"Could not delete old index version '{name}': {e}")
+
+    def embed_query(self, query: str) -> list[float]:
+        """Embed a search query, reusing recent embeddings of the same normalized text."""
+        return self.embed_queries([query])[0]
 
-                # distance -> similarity score
-                similarity = 1 - distance
+    def embed_queries(self, queries: list[str]) -> list[list[float]]:
+        """Embed search queries; cache misses are embedded together in one batched call."""
+        if self.query_cache is None:
+            return self._get_embeddings(queries)
 
-                search_results.append({
-                    "content": doc,
-                    "course_code": metadata.get("code", ""),
-                    "course_name": metadata.get("name", ""),
-                    "relevance_score": similarity,
-                })
+        keys, embeddings, missing = self._lookup_queries(queries)
+        if missing:
+            embeddings = self._remember_queries(keys, embeddings, missing, self._get_embeddings(missing))
+        return embeddings
 
-        return search_results
+    async def aembed_queries(self, queries: list[str]) -> list[list[float]]:
+        """Awaitable `embed_queries`."""
+        if self.query_cache is None:
+            return await self._aget_embeddings(queries)
+
+        keys, embeddings, missing = self._lookup_queries(queries)
+        if missing:
+            embeddings = self._remember_queries(keys, embeddings, missing, await self._aget_embeddings(missing))
+        return embeddings
+
+    def _lookup_queries(self, queries: list[str]) -> tuple[list[str], list, list[str]]:
+        """Return (cache keys, cached embedding or None per query, distinct missing keys)."""
+        keys = [normalize_query(q) for q in queries]
+        embeddings = [self.query_cache.get(key) for key in keys]
+        missing = list(dict.fromkeys(key for key, embedding in zip(keys, embeddings) if embedding is None))
+        return keys, embeddings, missing
+
+    def _remember_queries(self, keys: list[str], embeddings: list, missing: list[str], fresh_embeddings: list) -> list:
+        fresh = dict(zip(missing, fresh_embeddings))
+        for key, embedding in fresh.items():
+            self.query_cache.put(key, embedding)
+        return [embedding if embedding is not None else fresh[key] for key, embedding in zip(keys, embeddings)]
+
+    def cache_stats(self) -> dict:
+        return {
+            "query_embeddings": self.query_cache.stats() if self.query_cache else None,
+            "embeddings": self.embedding_cache.stats() if self.embedding_cache else None,
+        }
+
+    def search(
+        self,
+        query: str,
+        n_results: int = 5,
+        filters: dict | None = None,
+        mode: str | None = None,
+    ) -> list[dict]:
+        """Top-k search, optionally restricted by metadata `filters`.
+
+        Filters (e.g. {"department": "CISE", "credits": {"$gte": 3}}) are applied
+        inside the index, before ranking. `mode` is "vector" (embeddings only),
+        "lexical" (BM25 only, no embedding call) or "hybrid" (both, fused with
+        reciprocal-rank fusion); it defaults to the store's search_mode.
+        """
+        return self.search_many([query], n_results=n_results, filters=filters, mode=mode)[0]
+
+    def search_many(
+        self,
+        queries: list[str],
+        n_results: int = 5,
+        filters: dict | None = None,
+        mode: str | None = None,
+        query_embeddings: list[list[float]] | None = None,
+    ) -> list[list[dict]]:
+        """Run `search` for several queries with one embedding call and one index query.
+
+        `query_embeddings` skips the embedding call when the caller already has them.
+        """
+        if not queries:
+            return []
+
+        mode = (mode or self.search_mode).lower()
+        # one snapshot per call, so a concurrent swap can't mix index versions
+        index, lexical_index = self._active
+
+        if mode == "lexical":
+            results = []
+            for query in queries:
+                hits = lexical_index.search(query, n_results, filters=filters)
+                # BM25 scores are unbounded, so rank position is the relevance signal
+                results.append([_to_result(hit, 1.0 / rank) for rank, hit in enumerate(hits, 1)])
+            return results
+
+        if mode == "hybrid":
+            # over-fetch from both retrievers so fusion has something to reorder
+            depth = max(n_results * 4, 20)
+            vector_hits = [[] for _ in queries]
+            if index:
+                if query_embeddings is None:
+                    query_embeddings = self.embed_queries(queries)
+                vector_hits = index.query(query_embeddings, depth, filters=filters)
+            results = []
+            for query, hits in zip(queries, vector_hits):
+                lexical_hits = lexical_index.search(query, depth, filters=filters)
+                fused = reciprocal_rank_fusion([hits, lexical_hits])
+                results.append([_to_result(hit, score) for hit, score in fused[:n_results]])
+            return results
+
+        if mode != "vector":
+            raise ValueError(f"Unknown search mode: {mode} (expected 'vector', 'lexical' or 'hybrid')")
+
+        if index is None:
+            return [[] for _ in queries]
+
+        if query_embeddings is None:
+            query_embeddings = self.embed_queries(queries)
+        return [
+            [_to_result(hit, hit["score"]) for hit in hits]
+            for hits in index.query(query_embeddings, n_results, filters=filters)
+        ]
+
+    async def asearch_many(
+        self,
+        queries: list[str],
+        n_results: int = 5,
+        filters: dict | None = None,
+        mode: str | None = None,
+    ) -> list[list[dict]]:
+        """Awaitable `search_many`: embeddings come from the async client, the index scan runs in a worker thread."""
+        if not queries:
+            return []
+
+        mode = (mode or self.search_mode).lower()
+        query_embeddings = None
+        if mode in ("vector", "hybrid") and self.index is not None:
+            query_embeddings = await self.aembed_queries(queries)
+        return await asyncio.to_thread(self.search_many, queries, n_results, filters, mode, query_embeddings)
 
     def clear(self):
-        # clear doc from collection
-        self.chroma_client.delete_collection("courses")
-        self.collection = self.chroma_client.get_or_create_collection(
-            name="courses",
-            metadata={"hnsw:space": "cosine"}
-        )
+        # drop every index version for this provider/model
+        with self._build_lock:
+            self._active = (None, BM25Index())
+            self._write_pointer(None)
+            self._collect_garbage(keep=set())
         logger.info("Vector store cleared")
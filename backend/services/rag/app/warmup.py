@@ -0,0 +1,141 @@
+import logging
+import threading
+import time
+from datetime import datetime, tzinfo
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from app.rag_engine import GENERATION_ERROR_PREFIX, RAGEngine
+
+logger = logging.getLogger(__name__)
+
+WARMUP_QUESTIONS = [
+    "Which courses cover data structures and algorithms?",
+    "What are the prerequisites for an introductory programming course?",
+    "Are there any machine learning courses for undergraduates?",
+]
+WEEKDAYS = ["mon", "tue", "wed", "thu", "fri", "sat", "sun"]
+
+
+def parse_hours(spec: str) -> tuple[int, int]:
+    """Parse "8-20" into (8, 20): active from 08:00 up to, not including, 20:00."""
+    start, _, end = spec.partition("-")
+    return int(start), int(end or 24)
+
+
+def parse_days(spec: str) -> frozenset[int]:
+    """Parse "mon-fri" or "mon,wed,fri" into weekday numbers (Monday is 0)."""
+    days = set()
+    for part in spec.lower().replace(" ", "").split(","):
+        if not part:
+            continue
+        first, _, last = part.partition("-")
+        start, end = WEEKDAYS.index(first[:3]), WEEKDAYS.index((last or first)[:3])
+        days.update(range(start, end + 1) if start <= end else [*range(start, 7), *range(0, end + 1)])
+    return frozenset(days)
+
+
+class ModelWarmer:
+    """Brings the embedding and chat models up before the service reports ready.
+
+    `start()` runs in a background thread: it preloads both models (Ollama
+    only; other providers have nothing to load), sends `warmup_queries`
+    synthetic questions through the full query path, and retries every
+    `retry_interval` seconds until that succeeds. Afterwards it re-pings the
+    models every `ping_interval` seconds inside the active hours and days so
+    Ollama's keep_alive never expires during the working day.
+    """
+
+    def __init__(
+        self,
+        rag_engine: RAGEngine,
+        warmup_queries: int = 2,
+        ping_interval: float = 240.0,
+        active_hours: tuple[int, int] = (8, 20),
+        active_days: frozenset[int] = frozenset(range(5)),
+        timezone: str = "America/New_York",
+        retry_interval: float = 10.0,
+    ):
+        self.rag_engine = rag_engine
+        self.warmup_queries = max(0, warmup_queries)
+        self.ping_interval = ping_interval
+        self.active_hours = active_hours
+        self.active_days = active_days
+        self.retry_interval = retry_interval
+        self._ready = threading.Event()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+        try:
+            self.timezone: tzinfo | None = ZoneInfo(timezone)
+        except (ZoneInfoNotFoundError, ValueError):
+            logger.warning(f"Unknown time zone {timezone!r}; using the server's local time for keep-alive hours")
+            self.timezone = None
+
+    @property
+    def ready(self) -> bool:
+        return self._ready.is_set()
+
+    @property
+    def status(self) -> str:
+        return "ok" if self.ready else "warming"
+
+    def start(self) -> threading.Thread:
+        self._thread = threading.Thread(target=self._run, name="model-warmer", daemon=True)
+        self._thread.start()
+        return self._thread
+
+    def stop(self):
+        self._stop.set()
+
+    def wait_until_ready(self, timeout: float | None = None) -> bool:
+        return self._ready.wait(timeout)
+
+    def is_active(self, now: datetime | None = None) -> bool:
+        now = now or datetime.now(self.timezone)
+        start, end = self.active_hours
+        return now.weekday() in self.active_days and start <= now.hour < end
+
+    def warm_up(self):
+        vector_store = self.rag_engine.vector_store
+
+        start = time.perf_counter()
+        if vector_store.preload_model():
+            logger.info(f"Embedding model {vector_store.embedding_model} loaded in {time.perf_counter() - start:.1f}s")
+
+        start = time.perf_counter()
+        if self.rag_engine.preload_model():
+            logger.info(f"Chat model {self.rag_engine.chat_model} loaded in {time.perf_counter() - start:.1f}s")
+
+        # end-to-end requests also warm connections, caches and the index
+        for question in (WARMUP_QUESTIONS * self.warmup_queries)[:self.warmup_queries]:
+            start = time.perf_counter()
+            result = self.rag_engine.query(question)
+            if result.get("answer", "").startswith(GENERATION_ERROR_PREFIX):
+                raise RuntimeError(result["answer"])
+            logger.info(f"Warmup query answered in {time.perf_counter() - start:.2f}s")
+
+    def ping(self):
+        self.rag_engine.vector_store.preload_model()
+        self.rag_engine.preload_model()
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.warm_up()
+                break
+            except Exception as e:
+                logger.warning(f"Model warmup failed, retrying in {self.retry_interval:.0f}s: {e}")
+                self._stop.wait(self.retry_interval)
+        else:
+            return
+
+        self._ready.set()
+        logger.info("Models are warm; reporting ready")
+
+        while not self._stop.wait(self.ping_interval):
+            if not self.is_active():
+                continue
+            try:
+                self.ping()
+            except Exception as e:
+                logger.warning(f"Keep-alive ping failed: {e}")
@@ -0,0 +1 @@
+# makes the service directory importable for tests, like running `python -m app.grpc_server` from it
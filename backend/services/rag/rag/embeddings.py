@@ -2,12 +2,29 @@ import os
 import requests
 from statistics import mean
 
+# the rag/ scripts share the service's cache class, so run them from the
+# service directory (where `app` is importable), e.g. `python -m rag.ingest_oneuf`
+from app.embedding_cache import EmbeddingCache
+
 HF_TOKEN = os.getenv("HF_TOKEN")
 EMBED_MODEL = os.getenv("HF_EMBED_MODEL", "sentence-transformers/all-MiniLM-L6-v2")
 
 API = f"https://api-inference.huggingface.co/pipeline/feature-extraction/{EMBED_MODEL}"
 HEADERS = {"Authorization": f"Bearer {HF_TOKEN}"} if HF_TOKEN else {}
 
+# Same on-disk cache the RAG service uses, with the same default
+# (<CHROMA_PATH>/embedding_cache.sqlite3); set EMBEDDING_CACHE_PATH="" to disable
+CHROMA_PATH = os.getenv("CHROMA_PATH", "/app/data/chroma")
+CACHE_PATH = os.getenv("EMBEDDING_CACHE_PATH", os.path.join(CHROMA_PATH, "embedding_cache.sqlite3"))
+CACHE_SIZE = int(os.getenv("EMBEDDING_CACHE_SIZE", "200000"))
+_cache = None
+
+def _get_cache():
+    global _cache
+    if _cache is None and CACHE_PATH:
+        _cache = EmbeddingCache(CACHE_PATH, max_entries=CACHE_SIZE)
+    return _cache
+
 def _flatten(vec):
     """Mean-pool if HF returns token embeddings."""
     if not vec:
@@ -18,6 +35,21 @@ def _flatten(vec):
     return vec
 
 def embed_texts(texts: list[str]) -> list[list[float]]:
+    cache = _get_cache()
+    if cache is None:
+        return _embed_uncached(texts)
+
+    out = cache.get_many("huggingface", EMBED_MODEL, texts)
+    missing = [i for i, vec in enumerate(out) if vec is None]
+    if missing:
+        missing_texts = [texts[i] for i in missing]
+        fresh = _embed_uncached(missing_texts)
+        cache.put_many("huggingface", EMBED_MODEL, missing_texts, fresh)
+        for i, vec in zip(missing, fresh):
+            out[i] = vec
+    return out
+
+def _embed_uncached(texts: list[str]) -> list[list[float]]:
     out = []
     for t in texts:
         resp = requests.post(
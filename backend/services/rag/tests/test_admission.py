@@ -0,0 +1,231 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from app.admission import (
+    AdmissionTimeout,
+    AsyncConcurrencyLimiter,
+    ConcurrencyLimiter,
+    QueueFull,
+    request_scope,
+    split_limit,
+)
+
+
+def hold_slot(limiter: ConcurrencyLimiter) -> tuple[threading.Event, threading.Thread]:
+    """Occupy one slot from another thread until the returned event is set."""
+    acquired = threading.Event()
+    release = threading.Event()
+
+    def run():
+        with limiter.acquire():
+            acquired.set()
+            release.wait()
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    assert acquired.wait(1)
+    return release, thread
+
+
+def test_caps_concurrent_calls():
+    limiter = ConcurrencyLimiter("test", max_concurrency=2, max_queue=16)
+    lock = threading.Lock()
+    running = 0
+    peak = 0
+
+    def call():
+        nonlocal running, peak
+        with request_scope(None), limiter.acquire():
+            with lock:
+                running += 1
+                peak = max(peak, running)
+            time.sleep(0.02)
+            with lock:
+                running -= 1
+
+    threads = [threading.Thread(target=call) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert peak == 2
+    stats = limiter.stats()
+    assert stats["admitted"] == 8
+    assert stats["in_flight"] == 0
+    assert stats["queue_depth"] == 0
+
+
+def test_full_queue_rejects_requests():
+    limiter = ConcurrencyLimiter("test", max_concurrency=1, max_queue=0)
+    release, thread = hold_slot(limiter)
+    try:
+        with request_scope(5.0), pytest.raises(QueueFull):
+            with limiter.acquire():
+                pass
+    finally:
+        release.set()
+        thread.join()
+
+    assert limiter.stats()["rejected"] == 1
+    with request_scope(5.0), limiter.acquire():
+        pass
+
+
+def test_waiting_stops_at_the_request_deadline():
+    limiter = ConcurrencyLimiter("test", max_concurrency=1, max_queue=4)
+    release, thread = hold_slot(limiter)
+    start = time.monotonic()
+    try:
+        with request_scope(0.05), pytest.raises(AdmissionTimeout):
+            with limiter.acquire():
+                pass
+    finally:
+        release.set()
+        thread.join()
+
+    assert time.monotonic() - start < 1
+    stats = limiter.stats()
+    assert stats["timed_out"] == 1
+    assert stats["queue_depth"] == 0
+
+
+def test_work_outside_requests_waits_for_a_slot():
+    limiter = ConcurrencyLimiter("test", max_concurrency=1, max_queue=0)
+    release, thread = hold_slot(limiter)
+    threading.Timer(0.05, release.set).start()
+
+    with limiter.acquire():
+        assert limiter.stats()["in_flight"] == 1
+    thread.join()
+
+    stats = limiter.stats()
+    assert stats["rejected"] == 0
+    assert stats["admitted"] == 2
+    assert stats["max_wait_ms"] > 0
+
+
+def test_background_work_leaves_a_slot_for_requests():
+    limiter = ConcurrencyLimiter("test", max_concurrency=3, max_queue=0)
+    lock = threading.Lock()
+    running = 0
+    peak = 0
+    request_admitted = threading.Event()
+
+    def build_batch():
+        nonlocal running, peak
+        with limiter.acquire():
+            with lock:
+                running += 1
+                peak = max(peak, running)
+            request_admitted.wait(1)
+            with lock:
+                running -= 1
+
+    threads = [threading.Thread(target=build_batch) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    time.sleep(0.05)
+
+    # the queue is full for requests (max_queue=0), so this only passes with a slot free
+    with request_scope(0.5), limiter.acquire():
+        request_admitted.set()
+    for thread in threads:
+        thread.join()
+
+    assert peak == 2
+    assert limiter.stats()["rejected"] == 0
+    assert limiter.background_in_flight == 0
+
+
+def test_no_deadline_means_unbounded_wait():
+    limiter = ConcurrencyLimiter("test", max_concurrency=1, max_queue=4)
+    release, thread = hold_slot(limiter)
+    threading.Timer(0.05, release.set).start()
+
+    with request_scope(None), limiter.acquire():
+        pass
+    thread.join()
+    assert limiter.stats()["timed_out"] == 0
+
+
+def test_async_limiter_caps_and_times_out():
+    async def main():
+        limiter = AsyncConcurrencyLimiter("test", max_concurrency=2, max_queue=8)
+        running = 0
+        peak = 0
+
+        async def call():
+            nonlocal running, peak
+            async with limiter.acquire():
+                running += 1
+                peak = max(peak, running)
+                await asyncio.sleep(0.02)
+                running -= 1
+
+        with request_scope(None):
+            await asyncio.gather(*(call() for _ in range(6)))
+        assert peak == 2
+
+        release = asyncio.Event()
+
+        async def hold():
+            async with limiter.acquire():
+                await release.wait()
+
+        with request_scope(None):
+            holders = [asyncio.create_task(hold()) for _ in range(2)]
+        await asyncio.sleep(0)
+        with request_scope(0.05):
+            with pytest.raises(AdmissionTimeout):
+                async with limiter.acquire():
+                    pass
+        release.set()
+        await asyncio.gather(*holders)
+        return limiter.stats()
+
+    stats = asyncio.run(main())
+    assert stats["admitted"] == 8
+    assert stats["timed_out"] == 1
+    assert stats["in_flight"] == 0
+
+
+def test_split_limit_shares_one_budget():
+    assert split_limit("LIMIT", 5, asynchronous=False) == (5, 0)
+    assert split_limit("LIMIT", 5, asynchronous=True) == (2, 3)
+    assert split_limit("LIMIT", 2, asynchronous=True, minimum=1) == (1, 1)
+    assert split_limit("LIMIT", 1, asynchronous=True) == (0, 1)
+
+
+def test_split_limit_rejects_a_concurrency_of_one_in_async_mode():
+    assert split_limit("LIMIT", 1, asynchronous=False, minimum=1) == (1, 0)
+    with pytest.raises(ValueError, match="LIMIT=1"):
+        split_limit("LIMIT", 1, asynchronous=True, minimum=1)
+
+
+def test_async_background_work_leaves_a_slot_for_requests():
+    async def main():
+        limiter = AsyncConcurrencyLimiter("test", max_concurrency=2, max_queue=0)
+        release = asyncio.Event()
+
+        async def build_batch():
+            async with limiter.acquire():
+                await release.wait()
+
+        batches = [asyncio.create_task(build_batch()) for _ in range(3)]
+        await asyncio.sleep(0.01)
+        assert limiter.in_flight == 1
+
+        with request_scope(0.5):
+            async with limiter.acquire():
+                assert limiter.in_flight == 2
+        release.set()
+        await asyncio.gather(*batches)
+        return limiter.stats()
+
+    stats = asyncio.run(main())
+    assert stats["admitted"] == 4
+    assert stats["rejected"] == 0
@@ -0,0 +1,70 @@
+import json
+
+import pytest
+
+from app.catalog_snapshot import load_catalog, source_digest
+from app.catalog_watcher import CatalogWatcher
+from app.rag_engine import RAGEngine
+from app.vector_store import VectorStore
+
+
+def course(code: str) -> dict:
+    return {
+        "code": code,
+        "name": f"Course {code}",
+        "description": "An introduction.",
+        "prerequisites": "",
+        "sections": [{"credits": 3, "deptName": "CISE", "instructors": [], "meetTimes": []}],
+    }
+
+
+@pytest.fixture
+def engine_and_source(tmp_path):
+    source = tmp_path / "courses.json"
+    source.write_text(json.dumps([course("COP3502"), course("COP3503")]))
+    digest = source_digest(source)
+    courses, indexes = load_catalog(source)
+    vector_store = VectorStore(
+        persist_directory=str(tmp_path / "index"), embedding_provider="offline", index_backend="numpy"
+    )
+    vector_store.add_courses(courses)
+    engine = RAGEngine(vector_store, courses, llm_provider="offline", course_indexes=indexes)
+    return engine, source, digest
+
+
+def test_reload_publishes_index_and_catalog_together(engine_and_source):
+    engine, source, digest = engine_and_source
+    source.write_text(json.dumps([course("COP3502"), course("COP3503"), course("COP3504")]))
+    old_version = engine.vector_store.index_version
+
+    seen = []
+    set_courses = engine.set_courses
+
+    def record(courses, indexes=None):
+        # the new catalog goes live while the old index version is still serving
+        seen.append(engine.vector_store.index_version)
+        set_courses(courses, indexes)
+
+    engine.set_courses = record
+    result = CatalogWatcher(engine, source, poll_interval=0, digest=digest).reload().result()
+
+    assert result["reloaded"] and result["courses"] == 3
+    assert seen == [old_version]
+    assert engine.vector_store.index_version != old_version
+    assert engine.catalog.get("COP3504") is not None
+
+
+def test_failed_publish_keeps_the_old_index(engine_and_source):
+    engine, source, digest = engine_and_source
+    source.write_text(json.dumps([course("COP3502")]))
+    old_version = engine.vector_store.index_version
+
+    def fail(courses, indexes=None):
+        raise RuntimeError("boom")
+
+    engine.set_courses = fail
+    with pytest.raises(RuntimeError):
+        CatalogWatcher(engine, source, poll_interval=0, digest=digest).reload().result()
+
+    assert engine.vector_store.index_version == old_version
+    assert len(engine.courses) == 2
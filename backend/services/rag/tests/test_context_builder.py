@@ -0,0 +1,32 @@
+from app.context_builder import ContextBuilder
+from app.course_loader import Course
+
+
+def hit(code: str, department: str, instructors: tuple[str, ...]) -> dict:
+    course = Course(code, f"Course {code}", "An introduction.", "", 3, department, instructors, ())
+    return {"content": course.to_document(), "course_code": code, "relevance_score": 1.0}
+
+
+HITS = [
+    hit("COP3502", "Computer & Information Science & Engineering", ("Alice Smith",)),
+    hit("MAC2311", "Mathematics", ("Bob Jones",)),
+]
+
+
+def test_unrequested_fields_are_left_out():
+    text = ContextBuilder(token_budget=0).build("Which courses are introductory?", HITS).text
+    assert "Instructors:" not in text
+    assert "Department:" not in text
+
+
+def test_keeps_fields_matching_a_question_word():
+    text = ContextBuilder(token_budget=0).build("courses by Smith", HITS).text
+    assert "Instructors: Alice Smith" in text
+    # only the hit whose instructors the question names
+    assert "Bob Jones" not in text
+
+
+def test_keeps_filtered_fields():
+    filters = {"department": ["Mathematics"]}
+    text = ContextBuilder(token_budget=0).build("introductory courses", HITS[1:], filters).text
+    assert "Department: Mathematics" in text
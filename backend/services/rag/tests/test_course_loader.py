@@ -0,0 +1,74 @@
+import json
+
+import pytest
+
+from app.course_loader import iter_json_array
+
+VALID = [
+    '[]',
+    ' [ ] \n',
+    '[1]',
+    '[{"a":1}, 12e5]',
+    '[12345678901234567890, -0.5e-3, 1.25E+2, 7]',
+    '[true, false, null, -Infinity, NaN]',
+    '["a, \\"quoted\\" ]string", "\\u00e9t\\u00e9", "café"]',
+    '[{"code": "COP3502", "sections": [{"credits": 3}, {"credits": 4}]}, [1, [2, [3]]], {}]',
+    '[\n  {"a": [1, 2, 3]},\n  {"b": "x"}\n]\n\n',
+]
+
+INVALID = [
+    '',
+    '   ',
+    '[1,]',
+    '[1, 2,  ]',
+    '[,1]',
+    '[1]x',
+    '[1] [2]',
+    '[1 2]',
+    '[1, 2',
+    '[12x]',
+    '[{"a": 1}',
+    '["unterminated]',
+]
+
+NOT_ARRAYS = ['{"a": 1}', '1', '"[1]"']
+
+CHUNK_SIZES = [1, 2, 3, 5, 7, 13, 64, 1 << 16]
+
+
+def write(tmp_path, text: str):
+    path = tmp_path / "data.json"
+    path.write_text(text, encoding="utf-8")
+    return path
+
+
+def parse(text: str):
+    # NaN compares unequal to itself, so compare serialized forms
+    return json.dumps(json.loads(text))
+
+
+@pytest.mark.parametrize("text", VALID)
+@pytest.mark.parametrize("chunk_size", CHUNK_SIZES)
+def test_matches_json_loads(tmp_path, text, chunk_size):
+    items = list(iter_json_array(write(tmp_path, text), chunk_size=chunk_size))
+    assert json.dumps(items) == parse(text)
+
+
+@pytest.mark.parametrize("text", INVALID)
+@pytest.mark.parametrize("chunk_size", CHUNK_SIZES)
+def test_rejects_what_json_loads_rejects(tmp_path, text, chunk_size):
+    with pytest.raises(ValueError):
+        json.loads(text)
+    with pytest.raises(ValueError):
+        list(iter_json_array(write(tmp_path, text), chunk_size=chunk_size))
+
+
+@pytest.mark.parametrize("text", NOT_ARRAYS)
+def test_rejects_other_top_level_values(tmp_path, text):
+    with pytest.raises(ValueError):
+        list(iter_json_array(write(tmp_path, text)))
+
+
+def test_number_split_at_chunk_boundary(tmp_path):
+    path = write(tmp_path, '[{"a":1}, 12e5]')
+    assert list(iter_json_array(path, chunk_size=13)) == [{"a": 1}, 12e5]
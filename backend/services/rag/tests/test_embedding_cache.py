@@ -0,0 +1,28 @@
+from app.embedding_cache import EmbeddingCache
+
+
+def test_evicts_least_recently_used_past_the_cap(tmp_path):
+    cache = EmbeddingCache(tmp_path / "cache.sqlite3", max_entries=20)
+    texts = [f"text {i}" for i in range(30)]
+    for i, text in enumerate(texts):
+        cache.put_many("offline", "m", [text], [[float(i)]])
+        if i == 15:
+            # keep an early entry recently used
+            cache.get_many("offline", "m", [texts[0]])
+
+    assert len(cache) <= 20
+    assert cache.get_many("offline", "m", [texts[0], texts[29], texts[1]]) == [[0.0], [29.0], None]
+
+
+def test_writes_below_the_cap_do_not_count_the_table(tmp_path):
+    cache = EmbeddingCache(tmp_path / "cache.sqlite3", max_entries=100)
+    statements = []
+    cache._conn.set_trace_callback(statements.append)
+
+    for i in range(50):
+        cache.put_many("offline", "m", [f"text {i}"], [[float(i)]])
+    # replacing entries only raises the estimate
+    for i in range(50):
+        cache.put_many("offline", "m", [f"text {i}"], [[float(i)]])
+    assert not any("COUNT(*)" in statement for statement in statements)
+    assert len(cache) == 50
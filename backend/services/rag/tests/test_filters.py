@@ -0,0 +1,24 @@
+from app.course_loader import Course, CourseCatalog
+from app.index_backends import filter_conditions, matches_filters
+from app.vector_store import VectorStore, course_metadata
+
+COURSE = Course("COP3502", "Programming Fundamentals", "Intro.", "", 3, "Computer Science", (), ())
+
+
+def test_department_filters_ignore_case_and_spacing():
+    metadata = course_metadata(COURSE)
+    for value in ("Computer Science", "computer science", ["COMPUTER  SCIENCE"]):
+        assert matches_filters(metadata, filter_conditions({"department": value}))
+    assert not matches_filters(metadata, filter_conditions({"department": ["Mathematics"]}))
+    assert filter_conditions({"credits": {"$gte": 3}}) == [("credits", "$gte", 3)]
+
+
+def test_search_and_catalog_agree_on_departments(tmp_path):
+    vector_store = VectorStore(persist_directory=str(tmp_path), embedding_provider="offline", index_backend="numpy")
+    vector_store.add_courses([COURSE])
+    filters = {"department": ["computer science"]}
+
+    assert [c.code for c in CourseCatalog([COURSE]).by_department("computer science")] == ["COP3502"]
+    for mode in ("vector", "lexical"):
+        hits = vector_store.search("programming", n_results=1, filters=filters, mode=mode)
+        assert [hit["course_code"] for hit in hits] == ["COP3502"]
@@ -0,0 +1,24 @@
+from app.lexical_index import BM25Index, tokenize
+
+PREFIXES = frozenset({"cop", "mac"})
+
+
+def test_joins_course_codes_with_known_prefixes():
+    assert tokenize("Is COP 3530 harder than cop3530?", PREFIXES) == ["cop3530", "harder", "cop3530"]
+
+
+def test_keeps_level_numbers_apart_from_words():
+    assert tokenize("the 3000 level", PREFIXES) == ["3000", "level"]
+    assert tokenize("any 4000 courses", PREFIXES) == ["any", "4000", "courses"]
+    assert tokenize("COP 3530", frozenset()) == ["cop", "3530"]
+
+
+def test_search_matches_codes_written_with_a_space():
+    index = BM25Index()
+    index.build(
+        ["COP3530", "MAC2311"],
+        ["Course: COP3530 - Data Structures", "Course: MAC2311 - Calculus 1\nPrerequisites: none"],
+        [{}, {}],
+    )
+    assert index.code_prefixes == PREFIXES
+    assert [hit["id"] for hit in index.search("cop 3530", n_results=1)] == ["COP3530"]
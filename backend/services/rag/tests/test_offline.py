@@ -0,0 +1,12 @@
+from app.offline import HashingEmbedder
+
+
+def test_bucket_memo_is_bounded():
+    embedder = HashingEmbedder(dim=64, bucket_cache_size=100)
+    first = embedder.embed(["intro to programming"])
+    for i in range(500):
+        embedder.embed([f"question number {i} about topic {i * 7}"])
+
+    assert embedder._bucket.cache_info().currsize <= 100
+    # evicted features hash to the same buckets again
+    assert embedder.embed(["intro to programming"]) == first
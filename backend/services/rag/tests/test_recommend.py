@@ -0,0 +1,25 @@
+from app.admission import ConcurrencyLimiter, request_scope
+from app.course_loader import Course
+from app.rag_engine import FALLBACK_EXPLANATION, RAGEngine
+from app.vector_store import VectorStore
+
+
+def test_rejected_explanation_falls_back_without_failing(tmp_path):
+    courses = [
+        Course(f"COP{3500 + i}", f"Programming {i}", "Programming in Python.", "", 3, "CISE", (), ())
+        for i in range(3)
+    ]
+    vector_store = VectorStore(persist_directory=str(tmp_path), embedding_provider="offline", index_backend="numpy")
+    limiter = ConcurrencyLimiter("chat", max_concurrency=1, max_queue=0)
+    engine = RAGEngine(vector_store, courses, llm_provider="offline", chat_limiter=limiter)
+
+    with limiter.acquire(), request_scope(5.0):
+        # the only slot is taken and requests may not queue
+        result = engine.recommend([], ["programming"])
+
+    assert result["courses"]
+    assert result["explanation"] == FALLBACK_EXPLANATION
+    assert len(engine.explanation_cache) == 0
+
+    with request_scope(5.0):
+        assert engine.recommend([], ["programming"])["explanation"] != FALLBACK_EXPLANATION